@@ -0,0 +1,455 @@
+# analysis.py
+import hashlib
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from html import escape
+from typing import NamedTuple
+import anyio.from_thread
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from .cache import TTLCache, content_key
+from .skills import skill_matcher, TAXONOMY_VERSION
+from .revision import (
+    AnnotationContext, annotate_line, build_annotation_context, generate_revised_resume, iter_revised_resume,
+)
+from .executor import analysis_pool
+from .similarity import score_term_counts, term_counts
+from .feature_store import FeatureStore, FEATURE_STORE_PATH
+from .instrumentation import span
+
+ACTION_VERBS = ['developed', 'implemented', 'managed', 'led', 'created', 'designed', 'built', 'optimized', 'increased', 'decreased', 'improved', 'delivered']
+
+_NUMBER_RE = re.compile(r'\d+')
+
+# Bump when the shape or meaning of extract_resume_features() output changes
+FEATURE_SCHEMA_VERSION = 4
+FEATURE_VERSION = hashlib.sha256(
+    f"{FEATURE_SCHEMA_VERSION}:{TAXONOMY_VERSION}:{','.join(ACTION_VERBS)}".encode()
+).hexdigest()[:16]
+
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', '256'))
+ANALYSIS_CACHE_TTL = float(os.getenv('ANALYSIS_CACHE_TTL', '3600'))
+SKILL_CACHE_SIZE = int(os.getenv('SKILL_CACHE_SIZE', '4096'))
+SKILL_CACHE_TTL = float(os.getenv('SKILL_CACHE_TTL', '86400'))
+# Re-analyze a signed-in user's edited resume from their previous submission's per-line results
+ANALYSIS_INCREMENTAL = os.getenv('ANALYSIS_INCREMENTAL', 'true').lower() == 'true'
+REVISION_STATE_CACHE_SIZE = int(os.getenv('REVISION_STATE_CACHE_SIZE', '256'))
+REVISION_STATE_CACHE_TTL = float(os.getenv('REVISION_STATE_CACHE_TTL', '3600'))
+
+# Level 1: full analysis per (resume, job description) pair
+analysis_cache = TTLCache(ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_TTL)
+# Level 2: skill extraction per document, shared by every job a resume is matched against
+skill_cache = TTLCache(SKILL_CACHE_SIZE, SKILL_CACHE_TTL)
+# Per-user RevisionState of the last analyzed submission
+revision_states = TTLCache(REVISION_STATE_CACHE_SIZE, REVISION_STATE_CACHE_TTL)
+
+
+@lru_cache(maxsize=None)
+def get_feature_store():
+    """
+    Level 3: per-user resume features, persisted across restarts; None when disabled.
+    Opened on first use, so pool workers that re-import this module never touch SQLite.
+    """
+    return FeatureStore(FEATURE_STORE_PATH, FEATURE_VERSION) if FEATURE_STORE_PATH else None
+
+
+def normalize_text(text):
+    """Normalize line endings and surrounding whitespace so equivalent submissions share cache entries."""
+    return '\n'.join(line.strip() for line in text.strip().splitlines())
+
+
+def extract_skills(text):
+    key = content_key(text)
+    skills = skill_cache.get(key)
+    if skills is None:
+        skills = frozenset(skill_matcher.skill_set(text))
+        skill_cache.set(key, skills)
+    return skills
+
+
+def extract_resume_features(resume):
+    """Everything the match needs from the resume alone, as a JSON-serializable dict."""
+    resume_lower = resume.lower()
+    return {
+        "skills": sorted(extract_skills(resume)),
+        "found_verbs": [verb for verb in ACTION_VERBS if verb in resume_lower],
+        "number_count": len(_NUMBER_RE.findall(resume)),
+        "length": len(resume),
+        "words": len(resume.split()),
+        # Term counts for text similarity, so matching another job never re-reads the resume
+        "terms": term_counts(resume),
+    }
+
+
+def build_suggestions(resume_length, missing_skills, match_percentage, found_verbs, number_count):
+    suggestions = []
+
+    if missing_skills:
+        suggestions.append("🔍 **Missing Skills to Add:**")
+        for skill in missing_skills:
+            suggestions.append(f"   • Consider adding experience with {skill.title()}")
+        suggestions.append("")
+
+    if match_percentage < 50:
+        suggestions.append("⚠️ **Low Skill Match Detected:**")
+        suggestions.append("   • Your resume shows limited alignment with the job requirements")
+        suggestions.append("   • Consider highlighting transferable skills and experiences")
+        suggestions.append("")
+
+    if len(found_verbs) < 3:
+        suggestions.append("📝 **Resume Writing Tips:**")
+        suggestions.append("   • Use more action verbs to describe your achievements")
+        suggestions.append("   • Quantify your accomplishments with specific numbers")
+        suggestions.append("   • Focus on results rather than just responsibilities")
+        suggestions.append("")
+
+    if number_count < 2:
+        suggestions.append("📊 **Quantify Your Achievements:**")
+        suggestions.append("   • Add specific metrics (e.g., 'increased sales by 25%')")
+        suggestions.append("   • Include project sizes, team sizes, or timeframes")
+        suggestions.append("   • Mention any awards, certifications, or recognitions")
+        suggestions.append("")
+
+    # Check resume length
+    if resume_length < 1000:
+        suggestions.append("📏 **Resume Length:**")
+        suggestions.append("   • Your resume seems quite short")
+        suggestions.append("   • Consider adding more details about your experiences")
+        suggestions.append("   • Include relevant projects, certifications, or volunteer work")
+        suggestions.append("")
+    elif resume_length > 3000:
+        suggestions.append("📏 **Resume Length:**")
+        suggestions.append("   • Your resume might be too long")
+        suggestions.append("   • Focus on the most relevant experiences for this position")
+        suggestions.append("   • Remove outdated or less relevant information")
+        suggestions.append("")
+
+    return suggestions
+
+
+def compute_match(resume, job_description, features=None):
+    """
+    Everything compute_analysis() returns except the revised resume, which callers
+    can produce separately with revise_in_pool().
+
+    `resume` is only read when `features` is not given.
+    """
+    if features is None:
+        features = extract_resume_features(resume)
+
+    resume_skills = frozenset(features["skills"])
+    job_skills = extract_skills(job_description)
+    found_verbs = features["found_verbs"]
+    number_count = features["number_count"]
+
+    missing_skills = sorted(job_skills - resume_skills)
+    matching_skills = sorted(resume_skills & job_skills)
+    match_percentage = len(matching_skills) / len(job_skills) * 100 if job_skills else 0
+
+    return {
+        "features": features,
+        "match_percentage": match_percentage,
+        "job_skills": sorted(job_skills),
+        "matching_skills": matching_skills,
+        "missing_skills": missing_skills,
+        "found_verbs": found_verbs,
+        "number_count": number_count,
+        "resume_length": features["length"],
+        "resume_words": features["words"],
+        "job_description_length": len(job_description),
+        "job_description_words": len(job_description.split()),
+        "suggestions": build_suggestions(features["length"], missing_skills, match_percentage, found_verbs, number_count),
+        # Whole-text TF-IDF similarity, so vocabulary outside the skill list counts too
+        "similarity": score_term_counts(job_description, [features["terms"]])[0],
+    }
+
+
+def compute_analysis(resume, job_description, features=None):
+    """
+    Analyze a resume against a job description, without the result cache.
+
+    Pass stored `features` (from extract_resume_features) to skip re-extracting them;
+    the features used are returned under the "features" key either way.
+    Module-level and picklable so it can run in a worker process.
+    """
+    result = compute_match(resume, job_description, features)
+    result["revised_resume"] = generate_revised_resume(
+        resume, result["job_skills"], result["missing_skills"], ACTION_VERBS, result["found_verbs"]
+    )
+    return result
+
+
+class LineFeatures(NamedTuple):
+    skills: frozenset
+    verbs: frozenset
+    number_count: int
+    words: int
+    terms: dict
+
+
+class RevisionState(NamedTuple):
+    """What one submission leaves behind for re-analyzing the next, edited one."""
+    lines: dict                  # stripped line -> LineFeatures
+    context: AnnotationContext   # what `annotations` were produced with (None before any)
+    annotations: dict            # stripped line -> annotated HTML
+
+
+def _line_features(line):
+    line_lower = line.lower()
+    return LineFeatures(
+        skills=frozenset(skill_matcher.skill_set(line)),
+        verbs=frozenset(verb for verb in ACTION_VERBS if verb in line_lower),
+        number_count=len(_NUMBER_RE.findall(line)),
+        words=len(line.split()),
+        terms=term_counts(line),
+    )
+
+
+def extract_line_features(lines):
+    """_line_features() of each line; module-level and picklable so it can run in a worker process."""
+    return [_line_features(line) for line in lines]
+
+
+def annotate_lines(lines, context):
+    """annotate_line() of each line; module-level and picklable so it can run in a worker process."""
+    return [annotate_line(line, context) for line in lines]
+
+
+def _resume_lines(resume):
+    """Stripped, non-empty lines of the resume, in order (repeats included)."""
+    return [stripped for stripped in (line.strip() for line in resume.split('\n')) if stripped]
+
+
+def sum_line_features(resume, lines):
+    """
+    Resume features (as extract_resume_features() returns them) summed from per-line
+    results; `lines` maps every stripped line of the resume to its LineFeatures.
+    """
+    skills = set()
+    verbs = set()
+    number_count = 0
+    words = 0
+    terms = Counter()
+    for line in _resume_lines(resume):
+        features = lines[line]
+        skills |= features.skills
+        verbs |= features.verbs
+        number_count += features.number_count
+        words += features.words
+        terms.update(features.terms)
+    return {
+        "skills": sorted(skills),
+        "found_verbs": [verb for verb in ACTION_VERBS if verb in verbs],
+        "number_count": number_count,
+        "length": len(resume),
+        "words": words,
+        "terms": dict(terms),
+    }
+
+
+async def _extract_changed_lines(resume, previous):
+    """
+    Per-line features of the resume, reusing those of the previous submission.
+
+    Lines are matched against the previous submission by content here on the event
+    loop; only new or edited lines are sent to the worker pool, so the cost of a
+    small edit does not grow with the rest of the document. Skills are found line by
+    line, so a multi-word skill broken across two lines is not counted as it would be
+    by a whole-document scan.
+    """
+    old_lines = previous.lines if previous else {}
+    lines = {}
+    changed = []
+    for line in _resume_lines(resume):
+        if line not in lines:
+            lines[line] = old_lines.get(line)
+            if lines[line] is None:
+                changed.append(line)
+    if changed:
+        lines.update(zip(changed, await analysis_pool.run(extract_line_features, changed)))
+    return lines
+
+
+async def match_in_pool(resume, job_description, user_id=None):
+    """
+    Cached compute_match() result; a cache miss is computed in the worker pool.
+
+    With a user_id, the resume's features are loaded from (or saved to) the feature store,
+    so matching a stored resume against another job only extracts the job description.
+    A signed-in user's features are otherwise summed per line, rescanning only the lines
+    that changed since their last submission (see _extract_changed_lines()); when this
+    process holds no state for them, stored features are used if present.
+    """
+    key = content_key('match', resume, job_description)
+    store = get_feature_store() if user_id else None
+    resume_hash = content_key(resume)
+    result = analysis_cache.get(key)
+    if result is None:
+        incremental = user_id and ANALYSIS_INCREMENTAL
+        previous = revision_states.get(user_id) if incremental else None
+        features = None
+        if store is not None and previous is None:
+            # No per-line state here (after a restart, or on another worker): stored
+            # features still spare the resume scan when this exact resume was seen before
+            with span("features"):
+                features = await run_in_threadpool(store.get, user_id, resume_hash)
+        with span("analysis"):
+            if incremental and features is None:
+                lines = await _extract_changed_lines(resume, previous)
+                features = sum_line_features(resume, lines)
+                # Annotations are keyed by line and context, so the previous ones stay usable
+                revision_states.set(user_id, RevisionState(
+                    lines, previous.context if previous else None, previous.annotations if previous else {}
+                ))
+            # With features in hand the resume text is not needed, so it is not sent
+            result = await analysis_pool.run(
+                compute_match, resume if features is None else None, job_description, features
+            )
+        analysis_cache.set(key, result)
+    if store is not None:
+        # Also marks this as the user's latest resume; a no-op when it already is
+        with span("features"):
+            await run_in_threadpool(store.put, user_id, resume_hash, result["features"])
+    return result
+
+
+async def revise_in_pool(resume, match, user_id=None):
+    """
+    The revised resume for a match_in_pool() result, as iter_revised_resume() pieces.
+
+    Only line annotation runs in the worker pool, and only for lines not already
+    annotated for this user under the same annotation context (job skills, missing
+    skills, verbs used); the pieces are assembled here from the per-line results.
+    """
+    context = build_annotation_context(match["job_skills"], match["missing_skills"], match["found_verbs"])
+    incremental = user_id and ANALYSIS_INCREMENTAL
+    previous = revision_states.get(user_id) if incremental else None
+    old_annotations = previous.annotations if previous and previous.context == context else {}
+    annotations = {}
+    changed = []
+    for line in _resume_lines(resume):
+        if line not in annotations:
+            annotations[line] = old_annotations.get(line)
+            if annotations[line] is None:
+                changed.append(line)
+    if changed:
+        with span("revision"):
+            annotations.update(zip(changed, await analysis_pool.run(annotate_lines, changed, context)))
+    if incremental:
+        revision_states.set(user_id, RevisionState(previous.lines if previous else {}, context, annotations))
+    return list(iter_revised_resume(
+        resume, match["job_skills"], match["missing_skills"], match["found_verbs"], annotations.__getitem__
+    ))
+
+
+async def revised_resume_in_pool(resume, job_description, match, user_id=None):
+    """revise_in_pool() behind the analysis cache, which it fills with the full result."""
+    key = content_key(resume, job_description)
+    result = analysis_cache.get(key)
+    if result is not None:
+        return [result["revised_resume"]]
+    sections = await revise_in_pool(resume, match, user_id)
+    analysis_cache.set(key, {**match, "revised_resume": ''.join(sections)})
+    return sections
+
+
+async def analyze_in_pool(resume, job_description, user_id=None, revise=True):
+    """
+    Cached analysis, computed in the worker pool instead of on the event loop:
+    match_in_pool(), plus the revised resume from revise_in_pool() unless revise=False.
+    Callers should pass text through normalize_text first and must treat the returned
+    dict as read-only.
+    """
+    match = await match_in_pool(resume, job_description, user_id)
+    if not revise:
+        return match
+    result = analysis_cache.get(content_key(resume, job_description))
+    if result is None:
+        sections = await revised_resume_in_pool(resume, job_description, match, user_id)
+        result = {**match, "revised_resume": ''.join(sections)}
+    return result
+
+
+def iter_revised_in_pool(resume, job_description, match, user_id=None):
+    """
+    Yield revised_resume_in_pool() pieces from a sync iterator, e.g. a streamed
+    template body, which Starlette iterates in a worker thread: the work is handed
+    back to the event loop and so still goes through the bounded analysis pool.
+    The response status is already sent by then, so a busy pool (503) or a timeout
+    (504) is reported in the page instead.
+    """
+    try:
+        sections = anyio.from_thread.run(revised_resume_in_pool, resume, job_description, match, user_id)
+    except HTTPException as e:
+        sections = [f'<p class="error">{escape(e.detail)}</p>']
+    yield from sections
+
+
+def iter_analysis(result, revised_sections=None):
+    """
+    Yield the rendered analysis in the order it is worth reading: match summary,
+    then suggestions, then the revised resume. When the result has no
+    "revised_resume", its pieces are taken from `revised_sections` (e.g.
+    iter_revised_in_pool()) only once everything before them has been consumed.
+    """
+    suggestions = result["suggestions"]
+    similarity = result["similarity"]
+    shared_terms = f" (strongest shared terms: {', '.join(similarity['top_terms'])})" if similarity["top_terms"] else ""
+    yield f"""
+## 📋 Resume Analysis Results
+
+### 📊 Match Summary
+**Skill Match Percentage:** {result["match_percentage"]:.1f}%
+**Text Similarity:** {similarity["score"]:.1f}%{shared_terms}
+
+### ✅ Skills You Have (Matching Job Requirements)
+{', '.join(result["matching_skills"]) if result["matching_skills"] else 'None found'}
+
+### 🎯 Skills Required by the Job
+{', '.join(result["job_skills"]) if result["job_skills"] else 'No specific skills identified'}
+
+### 📈 Resume Statistics
+- **Resume Length:** {result["resume_length"]} characters ({result["resume_words"]} words)
+- **Job Description Length:** {result["job_description_length"]} characters ({result["job_description_words"]} words)
+- **Action Verbs Used:** {len(result["found_verbs"])} out of {len(ACTION_VERBS)} recommended
+- **Quantified Achievements:** {'Yes' if result["number_count"] >= 2 else 'No'}
+"""
+    yield f"""
+### 💡 Suggestions for Improvement
+
+{chr(10).join(suggestions) if suggestions else 'Great job! Your resume appears well-aligned with the job requirements.'}
+
+### 🔍 Next Steps
+1. Review the missing skills and consider how your experience relates to them
+2. Add specific metrics and achievements to your resume
+3. Use more action verbs to describe your responsibilities
+4. Tailor your resume to highlight relevant experiences for this specific role
+
+---
+
+## 📝 Revised Resume with Suggestions
+
+<div class="revised-resume">
+"""
+    if "revised_resume" in result:
+        yield result["revised_resume"]
+    else:
+        yield from revised_sections
+    yield """
+</div>
+"""
+
+
+def render_analysis(result):
+    return ''.join(iter_analysis(result))
+
+
+def cache_stats():
+    return {
+        "analysis": analysis_cache.stats(),
+        "skills": skill_cache.stats(),
+        "revision_states": revision_states.stats(),
+        "pool": analysis_pool.stats(),
+    }
@@ -0,0 +1,174 @@
+# assets.py
+"""
+Fingerprinted, precompressed static assets.
+
+Each file under STATIC_DIR is copied into ASSET_BUILD_DIR under a name that carries
+a hash of its content (styles.css -> styles.3f2a9c1b7d4e.css), next to .gz and,
+when the optional brotli package is installed, .br variants. Templates link assets
+through asset_url(), so a changed file gets a new URL and every fingerprinted URL
+can be cached by browsers and proxies forever.
+
+Build ahead of deploys with `python -m employee_repo.assets`, or let the app build
+on startup (ASSET_BUILD_ON_STARTUP, the default).
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from mimetypes import guess_type
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+
+STATIC_DIR = os.getenv('STATIC_DIR', './employee_repo/static')
+ASSET_BUILD_DIR = os.getenv('ASSET_BUILD_DIR', './employee_repo/static_build')
+ASSET_BUILD_ON_STARTUP = os.getenv('ASSET_BUILD_ON_STARTUP', 'true').lower() == 'true'
+ASSET_URL_PREFIX = '/static'
+
+MANIFEST_NAME = 'manifest.json'
+# Only text formats shrink enough to be worth a compressed copy
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# Preferred first when the client accepts several
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Logical path -> fingerprinted path, and fingerprinted path -> encodings available
+manifest = {}
+encodings = {}
+_fingerprinted = set()
+
+
+def fingerprinted_name(path, content):
+    root, extension = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+
+
+def _compressors():
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        # Optional dependency; without it only gzip variants are written
+        import brotli
+    except ImportError:
+        return compressors
+    compressors['br'] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+def _write(path, content):
+    # Write then rename, so workers building at the same time never serve a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def build_assets(source=STATIC_DIR, target=ASSET_BUILD_DIR):
+    """Fingerprint and precompress every file under `source` into `target`; returns the manifest."""
+    compressors = _compressors()
+    built = {"assets": {}, "encodings": {}}
+    for directory, _, filenames in os.walk(source):
+        for filename in sorted(filenames):
+            source_path = os.path.join(directory, filename)
+            path = os.path.relpath(source_path, source).replace(os.sep, '/')
+            with open(source_path, 'rb') as f:
+                content = f.read()
+
+            name = fingerprinted_name(path, content)
+            built["assets"][path] = name
+            # The plain name is kept too, so old links keep working (without long caching)
+            _write(os.path.join(target, path), content)
+            _write(os.path.join(target, name), content)
+
+            media_type = guess_type(path)[0] or ''
+            if not media_type.startswith(COMPRESSIBLE_TYPES):
+                continue
+            available = []
+            for encoding, suffix in ENCODINGS:
+                if encoding not in compressors:
+                    continue
+                compressed = compressors[encoding](content)
+                if len(compressed) < len(content):
+                    _write(os.path.join(target, name + suffix), compressed)
+                    available.append(encoding)
+            built["encodings"][name] = available
+
+    _write(os.path.join(target, MANIFEST_NAME), json.dumps(built, indent=2, sort_keys=True).encode())
+    _load(built)
+    return built
+
+
+def load_manifest(target=ASSET_BUILD_DIR):
+    """Use assets built earlier (e.g. at deploy time); returns False if there is no build."""
+    try:
+        with open(os.path.join(target, MANIFEST_NAME)) as f:
+            _load(json.load(f))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _load(built):
+    manifest.clear()
+    manifest.update(built["assets"])
+    encodings.clear()
+    encodings.update(built["encodings"])
+    _fingerprinted.clear()
+    _fingerprinted.update(manifest.values())
+
+
+def prepare_assets():
+    if ASSET_BUILD_ON_STARTUP or not load_manifest():
+        build_assets()
+
+
+def asset_url(path):
+    """URL of a static asset, fingerprinted once assets are built; use in templates."""
+    return f"{ASSET_URL_PREFIX}/{manifest.get(path, path)}"
+
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles over the asset build: serves the best precompressed variant the client
+    accepts, and marks fingerprinted files immutable.
+    """
+
+    async def get_response(self, path, scope):
+        path = path.replace(os.sep, '/')
+        encoding = self._choose_encoding(path, scope)
+        if encoding is None:
+            response = await super().get_response(path, scope)
+        else:
+            response = await super().get_response(path + dict(ENCODINGS)[encoding], scope)
+            response.headers['content-encoding'] = encoding
+            media_type = guess_type(path)[0]
+            if media_type and response.status_code == 200:
+                response.headers['content-type'] = (
+                    f"{media_type}; charset=utf-8" if media_type.startswith('text/') else media_type
+                )
+        if path in encodings:
+            response.headers['vary'] = 'Accept-Encoding'
+        if path in _fingerprinted:
+            response.headers['cache-control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers['cache-control'] = 'no-cache'
+        return response
+
+    @staticmethod
+    def _choose_encoding(path, scope):
+        available = encodings.get(path)
+        if not available:
+            return None
+        accepted = {
+            token.split(';')[0].strip().lower()
+            for token in Headers(scope=scope).get('accept-encoding', '').split(',')
+            if not token.strip().endswith(';q=0')
+        }
+        for encoding, _ in ENCODINGS:
+            if encoding in available and encoding in accepted:
+                return encoding
+        return None
+
+
+if __name__ == '__main__':
+    print(json.dumps(build_assets(), indent=2, sort_keys=True))
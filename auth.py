@@ -1,34 +1,109 @@
 # auth.py
-from fastapi import Request, HTTPException, status, Depends
+from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import hashlib
+import os
+import time
 import jwt
-from .database import SUPABASE_JWT_SECRET
+from starlette.requests import cookie_parser
+from .database import SUPABASE_JWT_SECRET, SUPABASE_JWT_SECRET_EMPLOYER
+from .cache import TTLCache
+from .instrumentation import span
 
 security = HTTPBearer()
 
-async def auth_middleware(request: Request, call_next):
-    token = request.cookies.get("access_token")
-    if token and token.startswith("Bearer "):
-        token = token.split(" ")[1]  # Extract the actual token
-        request.headers.__dict__["_list"].append(
-            (b"authorization", f"Bearer {token}".encode())
-        )
-    response = await call_next(request)
-    return response
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '4096'))
+JWT_CACHE_TTL = float(os.getenv('JWT_CACHE_TTL', '300'))
+JWT_REJECTED_CACHE_TTL = float(os.getenv('JWT_REJECTED_CACHE_TTL', '5'))
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Verified payloads keyed by a digest of the token, so raw tokens are never kept as keys
+token_cache = TTLCache(JWT_CACHE_SIZE, JWT_CACHE_TTL)
+# Short-lived record of rejected tokens, so a flood of bad tokens is cheap to turn away
+rejected_token_cache = TTLCache(JWT_CACHE_SIZE, JWT_REJECTED_CACHE_TTL)
+
+class AuthCookieMiddleware:
+    """
+    Pure ASGI middleware that copies the `access_token` cookie into an Authorization
+    header, so HTTPBearer can read it.
+
+    The header is added to the scope before the app runs; responses (streaming or not)
+    pass straight through untouched. Paths under `skip_paths` are left alone.
+    """
+
+    def __init__(self, app, skip_paths=("/static",)):
+        self.app = app
+        self.skip_paths = tuple(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith(self.skip_paths):
+            headers = scope["headers"]
+            cookie_header = None
+            has_authorization = False
+            for name, value in headers:
+                if name == b"cookie":
+                    cookie_header = value
+                elif name == b"authorization":
+                    has_authorization = True
+            if cookie_header is not None and not has_authorization:
+                token = cookie_parser(cookie_header.decode("latin-1")).get("access_token")
+                if token and token.startswith("Bearer "):
+                    token = token.split(" ")[1]  # Extract the actual token
+                    scope["headers"] = [*headers, (b"authorization", f"Bearer {token}".encode())]
+        await self.app(scope, receive, send)
+
+def _verify_token(token, secret=SUPABASE_JWT_SECRET):
+    """Decode and verify a token, returning (payload, None) or (None, error detail)."""
     try:
-        token = credentials.credentials
-        # Remove 'Bearer ' prefix if present
-        if token.startswith("Bearer "):
-            token = token.split(" ")[1]
         # Add 'options' parameter to ignore audience claim
-        payload = jwt.decode(token, SUPABASE_JWT_SECRET, algorithms=['HS256'], options={"verify_aud": False})
-        user_id = payload.get('sub')
-        if user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
-        return payload
+        payload = jwt.decode(token, secret, algorithms=['HS256'], options={"verify_aud": False})
     except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
-    except jwt.PyJWTError as e:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
\ No newline at end of file
+        return None, "Token has expired"
+    except jwt.PyJWTError:
+        return None, "Could not validate credentials"
+    if payload.get('sub') is None:
+        return None, "Invalid authentication credentials"
+    return payload, None
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    with span("auth"):
+        return _authenticate(credentials.credentials)
+
+def get_current_employer(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Like get_current_user, but only accepts tokens issued by the employer project."""
+    if not SUPABASE_JWT_SECRET_EMPLOYER:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Employer accounts are not configured")
+    with span("auth"):
+        return _authenticate(credentials.credentials, SUPABASE_JWT_SECRET_EMPLOYER, realm=b"employer")
+
+def _authenticate(token, secret=SUPABASE_JWT_SECRET, realm=b"user"):
+    # Remove 'Bearer ' prefix if present
+    if token.startswith("Bearer "):
+        token = token.split(" ")[1]
+
+    # The realm keeps a token verified for one project from being accepted for the other
+    key = hashlib.sha256(realm + b"\0" + token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    detail = rejected_token_cache.get(key)
+    if detail is not None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+    payload, detail = _verify_token(token, secret)
+    if detail is not None:
+        rejected_token_cache.set(key, detail)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+    # Never keep a verified payload past the token's own expiry
+    ttl = JWT_CACHE_TTL
+    if payload.get('exp') is not None:
+        ttl = min(ttl, payload['exp'] - time.time())
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+def token_cache_stats():
+    return {
+        "verified": token_cache.stats(),
+        "rejected": rejected_token_cache.stats(),
+    }
@@ -0,0 +1,117 @@
+# benchmarks/__main__.py
+"""
+Reproducible benchmarks for the resume analysis and the main pages.
+
+    python -m employee_repo.benchmarks run --output before.json
+    python -m employee_repo.benchmarks run --output after.json
+    python -m employee_repo.benchmarks compare before.json after.json --threshold 10
+
+Runs against the in-memory backend; no Supabase project is needed.
+"""
+import os
+
+# Must be set before the app is imported
+os.environ.setdefault('DATA_BACKEND', 'memory')
+os.environ.setdefault('ANALYSIS_POOL', 'thread')
+os.environ.setdefault('FEATURE_STORE_PATH', '')
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from . import load, micro
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(results, prefix=''):
+    """Map 'section/name/metric' to value for every numeric latency/throughput metric."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path + '/'))
+        elif key.endswith('_ms') or key == 'throughput_rps':
+            flat[path] = value
+    return flat
+
+
+def compare(before, after, threshold):
+    """Print per-metric changes; return the metrics that regressed by more than `threshold` percent."""
+    old, new = _flatten(before["results"]), _flatten(after["results"])
+    regressions = []
+    for metric in sorted(old.keys() & new.keys()):
+        if not old[metric]:
+            continue
+        change = (new[metric] - old[metric]) / old[metric] * 100
+        # Lower latency is better; higher throughput is better
+        worse = change < -threshold if metric.endswith('throughput_rps') else change > threshold
+        print(f"{'REGRESSION ' if worse else '           '}{metric}: {old[metric]} -> {new[metric]} ({change:+.1f}%)")
+        if worse:
+            regressions.append(metric)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('--output', help="write results to this JSON file")
+    run_parser.add_argument('--only', choices=['micro', 'load'], help="run one suite only")
+    run_parser.add_argument('--sizes', default=','.join(str(s) for s in micro.DEFAULT_SIZES),
+                            help="comma-separated resume sizes in lines")
+    run_parser.add_argument('--repeat', type=int, default=20)
+    run_parser.add_argument('--requests', type=int, default=500, help="requests per load scenario")
+    run_parser.add_argument('--concurrency', type=int, default=10)
+    run_parser.add_argument('--seed-employees', type=int, default=200)
+
+    compare_parser = commands.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.add_argument('--threshold', type=float, default=10.0,
+                                help="percent change that counts as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.before) as f:
+            before = json.load(f)
+        with open(args.after) as f:
+            after = json.load(f)
+        return 1 if compare(before, after, args.threshold) else 0
+
+    results = {}
+    if args.only in (None, 'micro'):
+        sizes = [int(size) for size in args.sizes.split(',')]
+        results["micro"] = micro.run(sizes, args.repeat)
+    if args.only in (None, 'load'):
+        results["load"] = load.run(args.requests, args.concurrency, args.seed_employees)
+
+    report = {
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+# benchmarks/data.py
+import os
+import random
+
+_SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_input.txt')
+_JOB_MARKER = 'Senior Python Developer'
+
+
+def sample_documents():
+    """The sample (resume, job description) pair shipped in test_input.txt."""
+    with open(_SAMPLE_PATH) as f:
+        text = f.read()
+    resume, job = text.split(_JOB_MARKER, 1)
+    return resume.strip(), (_JOB_MARKER + job).strip()
+
+
+def make_resume(line_count, seed=0):
+    """A resume of roughly `line_count` lines built by reshuffling the sample's lines."""
+    resume, _ = sample_documents()
+    lines = [line for line in resume.split('\n') if line.strip()]
+    rng = random.Random(seed)
+    return '\n'.join(rng.choice(lines) for _ in range(line_count))
+
+
+def make_job_description():
+    return sample_documents()[1]
@@ -0,0 +1,77 @@
+# benchmarks/load.py
+import asyncio
+import itertools
+import time
+from .stats import summarize
+
+BASE_URL = "http://benchmark"
+
+
+async def _drive(client, make_request, total, concurrency):
+    """Issue `total` requests from `concurrency` concurrent clients and summarize their latency."""
+    latencies = []
+    errors = 0
+    issued = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while next(issued) < total:
+            start = time.perf_counter()
+            response = await make_request(client)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = summarize(latencies, time.perf_counter() - start)
+    summary["errors"] = errors
+    return summary
+
+
+async def _run(requests, concurrency, seed_employees):
+    import httpx
+    from .. import database
+    from ..main import app, lifespan
+    from ..repositories import employee_repository
+
+    if database.DATA_BACKEND != 'memory':
+        raise RuntimeError("The load harness must run against DATA_BACKEND=memory")
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as client:
+            credentials = {"email": "bench@example.com", "password": "benchmark-password"}
+            await client.post("/signup", data=credentials)
+            response = await client.post("/login", data=credentials)
+            if "access_token" not in response.cookies:
+                raise RuntimeError("Could not log in to the benchmark app")
+
+            await employee_repository.create_many([
+                {"first_name": f"Seed{i}", "last_name": "Employee", "email": f"seed{i}@example.com", "salary": 50000 + i}
+                for i in range(seed_employees)
+            ])
+
+            new_ids = itertools.count()
+
+            def add_employee(c):
+                i = next(new_ids)
+                return c.post("/add", data={
+                    "first_name": f"Load{i}", "last_name": "Employee",
+                    "email": f"load{i}@example.com", "salary": "60000",
+                })
+
+            scenarios = {
+                "GET /employees": lambda c: c.get("/employees"),
+                "POST /add": add_employee,
+                "GET / (authenticated)": lambda c: c.get("/"),
+            }
+            results = {}
+            for name, make_request in scenarios.items():
+                results[name] = await _drive(client, make_request, requests, concurrency)
+            return results
+
+
+def run(requests=500, concurrency=10, seed_employees=200):
+    """In-process ASGI load test of the hot pages against the in-memory backend."""
+    return asyncio.run(_run(requests, concurrency, seed_employees))
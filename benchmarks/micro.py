@@ -0,0 +1,47 @@
+# benchmarks/micro.py
+import time
+from .data import make_resume, make_job_description
+from .stats import summarize
+
+DEFAULT_SIZES = (25, 250, 2500)
+
+
+def _time_calls(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    """Time skill extraction, the full analysis and the revised-resume pass across resume sizes."""
+    from ..analysis import ACTION_VERBS, compute_analysis, skill_cache
+    from ..revision import generate_revised_resume
+    from ..skills import skill_matcher
+
+    job_description = make_job_description()
+    job_skills = skill_matcher.skill_set(job_description)
+    results = {}
+    for size in sizes:
+        resume = make_resume(size, seed=size)
+        resume_skills = skill_matcher.skill_set(resume)
+        missing_skills = sorted(job_skills - resume_skills)
+        found_verbs = [verb for verb in ACTION_VERBS if verb in resume.lower()]
+
+        def analysis():
+            # Measure the work itself, not the per-document cache
+            skill_cache.clear()
+            compute_analysis(resume, job_description)
+
+        results[f"lines={size}"] = {
+            "chars": len(resume),
+            "skill_extraction": summarize(_time_calls(lambda: skill_matcher.find(resume), repeat)),
+            "generate_revised_resume": summarize(_time_calls(
+                lambda: generate_revised_resume(resume, job_skills, missing_skills, ACTION_VERBS, found_verbs),
+                repeat,
+            )),
+            "analysis": summarize(_time_calls(analysis, repeat)),
+        }
+    return results
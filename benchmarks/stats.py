@@ -0,0 +1,27 @@
+# benchmarks/stats.py
+import statistics
+
+
+def summarize(latencies, elapsed=None):
+    """Latency summary in milliseconds; adds throughput when the wall-clock `elapsed` is given."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+
+    def percentile(p):
+        if not ordered:
+            return 0.0
+        index = min(count - 1, max(0, round(p / 100 * count) - 1))
+        return ordered[index]
+
+    summary = {
+        "count": count,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "min_ms": round(ordered[0] * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(50) * 1000, 3),
+        "p95_ms": round(percentile(95) * 1000, 3),
+        "p99_ms": round(percentile(99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+    if elapsed:
+        summary["throughput_rps"] = round(count / elapsed, 2)
+    return summary
@@ -0,0 +1,198 @@
+# bulk_import.py
+import codecs
+import csv
+import json
+import os
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from .models import EmployeeBase
+from .repositories import BackendError, BackendUnavailable
+from .uploads import iter_upload
+
+BULK_IMPORT_BATCH_SIZE = int(os.getenv('BULK_IMPORT_BATCH_SIZE', '500'))
+BULK_IMPORT_MAX_BYTES = int(os.getenv('BULK_IMPORT_MAX_BYTES', str(50 * 1024 * 1024)))
+# Only this many per-row errors are listed in the response; all of them are counted
+BULK_IMPORT_MAX_ERRORS = int(os.getenv('BULK_IMPORT_MAX_ERRORS', '1000'))
+# A CSV record (which may span lines inside quotes) longer than this is reported and skipped
+BULK_IMPORT_MAX_RECORD_CHARS = int(os.getenv('BULK_IMPORT_MAX_RECORD_CHARS', str(64 * 1024)))
+
+FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(filename, content_type=None):
+    name = (filename or '').lower()
+    if name.endswith('.csv') or content_type == 'text/csv':
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or content_type in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return None
+
+
+async def iter_lines(upload: UploadFile):
+    """Decode an upload incrementally and yield complete lines, without reading it all into memory."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    async for chunk in iter_upload(upload):
+        pending += decoder.decode(chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def _scan_quotes(line, in_quotes, field_start):
+    """
+    Carry the csv module's quoting state across one line; returns (in_quotes, field_start).
+
+    As in csv, a quote opens a quoted field only as the first character of a field, so
+    a bare quote inside a field (O"Neil, 5" monitor) is plain text.
+    """
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if in_quotes:
+            if char == '"':
+                if line[i + 1:i + 2] == '"':
+                    i += 1
+                else:
+                    in_quotes = False
+        elif char == '"' and field_start:
+            in_quotes = True
+        field_start = char == ',' and not in_quotes
+        i += 1
+    return in_quotes, field_start
+
+
+async def iter_records(upload: UploadFile, fmt):
+    """Yield (row number, dict or None, error or None) for each data row of a CSV or NDJSON upload."""
+    if fmt == 'ndjson':
+        row_number = 0
+        async for line in iter_lines(upload):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "Expected a JSON object"
+                continue
+            yield row_number, record, None
+        return
+
+    header = None
+    row_number = 0
+    record_text = ''
+    in_quotes, field_start = False, True
+    async for line in iter_lines(upload):
+        # A quoted field may span lines; wait until it is closed before parsing
+        record_text += line
+        if in_quotes or '"' in line:
+            in_quotes, field_start = _scan_quotes(line, in_quotes, field_start)
+        if in_quotes:
+            if len(record_text) > BULK_IMPORT_MAX_RECORD_CHARS:
+                # Most likely an unclosed quote; skip ahead rather than buffer the rest of the file
+                row_number += 1
+                yield row_number, None, f"Record is longer than {BULK_IMPORT_MAX_RECORD_CHARS} characters"
+                record_text = ''
+                in_quotes, field_start = False, True
+            continue
+        text, record_text = record_text, ''
+        field_start = True
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"Expected {len(header)} columns, found {len(values)}"
+            continue
+        yield row_number, dict(zip(header, values)), None
+    if record_text.strip():
+        yield row_number + 1, None, "Unterminated quoted field"
+
+
+def _spooled_size(file):
+    position = file.tell()
+    size = file.seek(0, os.SEEK_END)
+    file.seek(position)
+    return size
+
+
+def _validation_message(error: ValidationError):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+async def import_employees(upload: UploadFile, fmt, repository, batch_size=BULK_IMPORT_BATCH_SIZE):
+    """
+    Validate every row against EmployeeBase and insert valid rows in multi-row batches.
+
+    A bad row never stops the import. If the backend rejects a whole batch (e.g. a
+    duplicate email), that batch is retried row by row so the error lands on the
+    right row and the rest still go in. If the backend cannot be reached (a timeout
+    or connection error), every row of that batch is reported failed and the import
+    moves on. Oversized files are refused before anything is imported.
+    """
+    # Multipart has already spooled the whole file, so its size is known up front
+    size = upload.size
+    if size is None:
+        size = await run_in_threadpool(_spooled_size, upload.file)
+    if size > BULK_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Import file is larger than {BULK_IMPORT_MAX_BYTES} bytes")
+
+    result = {"imported": 0, "failed": 0, "errors": []}
+
+    def fail(row_number, message):
+        result["failed"] += 1
+        if len(result["errors"]) < BULK_IMPORT_MAX_ERRORS:
+            result["errors"].append({"row": row_number, "error": message})
+
+    async def flush(batch):
+        if not batch:
+            return
+        try:
+            await repository.create_many([data for _, data in batch])
+            result["imported"] += len(batch)
+            return
+        except BackendUnavailable as e:
+            # Retrying each row would only wait out the same timeout again
+            for row_number, _ in batch:
+                fail(row_number, str(e))
+            return
+        except BackendError:
+            pass
+        for row_number, data in batch:
+            try:
+                await repository.create(data)
+                result["imported"] += 1
+            except BackendError as e:
+                fail(row_number, str(e))
+
+    batch = []
+    async for row_number, record, error in iter_records(upload, fmt):
+        if error is not None:
+            fail(row_number, error)
+            continue
+        try:
+            employee = EmployeeBase(**record)
+        except ValidationError as e:
+            fail(row_number, _validation_message(e))
+            continue
+        batch.append((row_number, employee.model_dump()))
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    await flush(batch)
+    result["errors"].sort(key=lambda error: error["row"])
+    return result
@@ -1,21 +1,31 @@
 # database.py
 import os
-from supabase import create_client, Client
+import secrets
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# 'supabase' talks to the configured projects; 'memory' uses the in-process stand-in in repositories.py
+DATA_BACKEND = os.getenv('DATA_BACKEND', 'supabase')
+
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')
 SUPABASE_BUCKET = os.getenv('SUPABASE_BUCKET')
 SUPABASE_URL_EMPLOYER = os.getenv('SUPABASE_URL_EMPLOYER')
 SUPABASE_KEY_EMPLOYER = os.getenv('SUPABASE_KEY_EMPLOYER')
+# Employer tokens are signed by the employer project; employer-only routes need this secret
+SUPABASE_JWT_SECRET_EMPLOYER = os.getenv('SUPABASE_JWT_SECRET_EMPLOYER')
+
+if DATA_BACKEND not in ('supabase', 'memory'):
+    raise EnvironmentError(f"Unknown DATA_BACKEND: {DATA_BACKEND}")
 
-if not all([SUPABASE_URL, SUPABASE_KEY, SUPABASE_JWT_SECRET, SUPABASE_BUCKET]):
+if DATA_BACKEND == 'supabase' and not all([SUPABASE_URL, SUPABASE_KEY, SUPABASE_JWT_SECRET, SUPABASE_BUCKET]):
     raise EnvironmentError("One or more Supabase environment variables are missing.")
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-supabase_employer: Client = create_client(SUPABASE_URL_EMPLOYER, SUPABASE_KEY_EMPLOYER)
+if DATA_BACKEND == 'memory' and not SUPABASE_JWT_SECRET:
+    # Tokens are issued and verified in-process, so any per-process secret will do
+    SUPABASE_JWT_SECRET = secrets.token_urlsafe(32)
+if DATA_BACKEND == 'memory' and not SUPABASE_JWT_SECRET_EMPLOYER:
+    SUPABASE_JWT_SECRET_EMPLOYER = secrets.token_urlsafe(32)
@@ -0,0 +1,101 @@
+# executor.py
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+
+ANALYSIS_POOL = os.getenv('ANALYSIS_POOL', 'process')  # 'process' or 'thread'
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', str(os.cpu_count() or 2)))
+ANALYSIS_MAX_PENDING = int(os.getenv('ANALYSIS_MAX_PENDING', '32'))
+ANALYSIS_TIMEOUT = float(os.getenv('ANALYSIS_TIMEOUT', '30'))
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound functions outside the event loop.
+
+    At most `max_pending` jobs may be queued or running at once; further calls are
+    rejected with 503 instead of piling up. A job that takes longer than `timeout`
+    seconds gives the caller a 504. The slot it holds is only released when the
+    worker actually finishes, so the bound stays honest.
+    """
+
+    def __init__(self, kind, workers, max_pending, timeout):
+        if kind not in ('process', 'thread'):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._pool = None
+
+    def _get_pool(self):
+        # Created on first use so importing the app does not start worker processes
+        if self._pool is None:
+            if self.kind == 'process':
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='analysis')
+        return self._pool
+
+    def _release(self, _future):
+        self.pending -= 1
+        self.completed += 1
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The analysis service is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self.pending -= 1
+            raise
+
+        def on_done(f):
+            try:
+                loop.call_soon_threadsafe(self._release, f)
+            except RuntimeError:
+                # Event loop already closed during shutdown
+                pass
+
+        future.add_done_callback(on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="The analysis took too long")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+analysis_pool = WorkerPool(ANALYSIS_POOL, ANALYSIS_WORKERS, ANALYSIS_MAX_PENDING, ANALYSIS_TIMEOUT)
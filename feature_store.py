@@ -0,0 +1,126 @@
+# feature_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# SQLite file holding one feature record per (user, resume content); empty disables the store
+FEATURE_STORE_PATH = os.getenv('FEATURE_STORE_PATH', './resume_features.sqlite3')
+
+
+class FeatureStore:
+    """
+    Persistent, versioned store of features extracted from submitted resumes.
+
+    Records are keyed by (user_id, content hash) and tagged with the feature version
+    they were extracted with. A record from another version is never returned, so
+    changing the skill taxonomy invalidates everything stored before it. Methods are
+    blocking; call them from a thread (e.g. run_in_threadpool) inside async code.
+    """
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            if path != ':memory:':
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS resume_features (
+                    user_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    features TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, content_hash)
+                )
+            """)
+            created = self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'resume_feature_changes'"
+            ).fetchone() is None
+            # One row per user pointing at their latest record. AUTOINCREMENT never reuses
+            # a seq and writers are serialized, so seq follows commit order across processes
+            # and is a safe sync cursor, unlike wall-clock timestamps.
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS resume_feature_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL UNIQUE,
+                    content_hash TEXT NOT NULL
+                )
+            """)
+            if created:
+                # Records written before the change log existed
+                self._connection.execute("""
+                    INSERT OR IGNORE INTO resume_feature_changes (user_id, content_hash)
+                    SELECT user_id, content_hash FROM resume_features AS r
+                    WHERE updated_at = (SELECT MAX(updated_at) FROM resume_features WHERE user_id = r.user_id)
+                    ORDER BY updated_at
+                """)
+
+    def get(self, user_id, content_hash):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version, features FROM resume_features WHERE user_id = ? AND content_hash = ?",
+                (user_id, content_hash),
+            ).fetchone()
+        if row is None or row[0] != self.version:
+            return None
+        return json.loads(row[1])
+
+    def put(self, user_id, content_hash, features):
+        """
+        Store features and mark them as the user's latest resume. Returns False without
+        writing when they already are, so resubmissions cost a read, not a new change.
+        """
+        with self._lock, self._connection:
+            latest = self._connection.execute(
+                """
+                SELECT r.version FROM resume_feature_changes AS c
+                JOIN resume_features AS r ON r.user_id = c.user_id AND r.content_hash = c.content_hash
+                WHERE c.user_id = ? AND c.content_hash = ?
+                """,
+                (user_id, content_hash),
+            ).fetchone()
+            if latest is not None and latest[0] == self.version:
+                return False
+            self._connection.execute(
+                "INSERT OR REPLACE INTO resume_features (user_id, content_hash, version, features, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, content_hash, self.version, json.dumps(features), time.time()),
+            )
+            # Replacing the user's row gives it a new, higher seq in the same transaction
+            self._connection.execute(
+                "INSERT OR REPLACE INTO resume_feature_changes (user_id, content_hash) VALUES (?, ?)",
+                (user_id, content_hash),
+            )
+        return True
+
+    def latest_since(self, seq=0):
+        """
+        Each user's most recently submitted resume features, for users who submitted
+        after change `seq`. Returns [(user_id, features, seq)] in change order.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT c.user_id, r.features, c.seq FROM resume_feature_changes AS c
+                JOIN resume_features AS r ON r.user_id = c.user_id AND r.content_hash = c.content_hash
+                WHERE c.seq > ? AND r.version = ?
+                ORDER BY c.seq
+                """,
+                (seq, self.version),
+            ).fetchall()
+        return [(user_id, json.loads(features), seq) for user_id, features, seq in rows]
+
+    def purge_stale(self):
+        """Delete records extracted with any other feature version; returns how many were removed."""
+        with self._lock, self._connection:
+            cursor = self._connection.execute("DELETE FROM resume_features WHERE version != ?", (self.version,))
+            self._connection.execute("""
+                DELETE FROM resume_feature_changes AS c WHERE NOT EXISTS (
+                    SELECT 1 FROM resume_features WHERE user_id = c.user_id AND content_hash = c.content_hash
+                )
+            """)
+        return cursor.rowcount
@@ -0,0 +1,63 @@
+# http_cache.py
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request
+from starlette.responses import Response
+from .cache import content_key
+
+# Version and modification time of the templates and static assets pages are rendered
+# with, set at startup, so a deploy that changes them invalidates every validator
+render_version = {"version": "", "last_modified": None}
+
+
+def set_render_version(version, last_modified=None):
+    render_version["version"] = version
+    render_version["last_modified"] = last_modified
+
+
+def make_etag(*values):
+    """Strong ETag derived from the data a page is rendered from and the render version."""
+    payload = json.dumps([render_version["version"], values], sort_keys=True, default=str)
+    return f'"{content_key(payload)[:32]}"'
+
+
+def _page_last_modified(last_modified):
+    # A page is as new as its data or the templates rendering it, whichever changed last
+    if last_modified is None or render_version["last_modified"] is None:
+        return last_modified
+    return max(last_modified, render_version["last_modified"])
+
+
+def validator_headers(etag, last_modified=None):
+    headers = {
+        "ETag": etag,
+        # Let browsers keep the page but make them revalidate on every view
+        "Cache-Control": "private, no-cache",
+    }
+    last_modified = _page_last_modified(last_modified)
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag, last_modified=None):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = _page_last_modified(last_modified)
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified_response(headers):
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,209 @@
+# instrumentation.py
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Opt-in profiler: profile a random sample of requests and keep the slow ones
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_SLOW_REQUEST_MS = float(os.getenv('PROFILE_SLOW_REQUEST_MS', '500'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', './profiles')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Spans of the request being handled; None outside a request
+_request_spans = ContextVar('request_spans', default=None)
+
+
+@contextmanager
+def span(name):
+    """Time a named stage of the current request (e.g. 'auth', 'db', 'render', 'analysis')."""
+    spans = _request_spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, time.perf_counter() - start))
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency = defaultdict(Histogram)   # (method, route) -> Histogram
+        self.requests = defaultdict(int)                # (method, route, status) -> count
+        self.stage_latency = defaultdict(Histogram)     # stage -> Histogram
+        self._collectors = []
+
+    def record(self, method, route, status_code, duration, spans):
+        with self._lock:
+            self.request_latency[(method, route)].observe(duration)
+            self.requests[(method, route, str(status_code))] += 1
+            for name, spent in spans:
+                self.stage_latency[name].observe(spent)
+
+    def register_counters(self, name, help_text, collect):
+        """
+        Export extra counters; `collect` returns {label value: number} and is called at scrape time.
+        Used for the cache hit/miss counters that already live elsewhere.
+        """
+        self._collectors.append((name, help_text, collect))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.request_latency.items()):
+                lines += _histogram_lines('http_request_duration_seconds', f'method="{method}",route="{_escape(route)}"', histogram)
+            lines += [
+                "# HELP http_requests_total Requests by route and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status_code), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}')
+            lines += [
+                "# HELP request_stage_duration_seconds Time spent per request stage.",
+                "# TYPE request_stage_duration_seconds histogram",
+            ]
+            for stage, histogram in sorted(self.stage_latency.items()):
+                lines += _histogram_lines('request_stage_duration_seconds', f'stage="{_escape(stage)}"', histogram)
+        for name, help_text, collect in self._collectors:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for label, value in sorted(collect().items()):
+                lines.append(f'{name}{{{label}}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name, labels, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+metrics = MetricsRegistry()
+
+
+def server_timing(spans, total):
+    totals = {}
+    for name, spent in spans:
+        totals[name] = totals.get(name, 0.0) + spent
+    entries = [f"{name};dur={spent * 1000:.2f}" for name, spent in totals.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class _SlowRequestProfiler:
+    """
+    Profiles a sampled request with cProfile and writes the profile only if the
+    request turned out slow. cProfile sees the whole event-loop thread, so other
+    requests interleaved with the sampled one show up in its profile too.
+    """
+
+    def __init__(self, sample_rate, slow_seconds, directory):
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.directory = directory
+        self._active = False
+
+    def start(self):
+        if self.sample_rate <= 0 or self._active or random.random() >= self.sample_rate:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already running in this process
+            return None
+        self._active = True
+        return profile
+
+    def stop(self, profile, route, duration):
+        profile.disable()
+        self._active = False
+        if duration < self.slow_seconds:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        safe_route = re.sub(r'[^A-Za-z0-9_.-]+', '_', route).strip('_') or 'root'
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(duration * 1000)}ms-{safe_route}.prof"
+        profile.dump_stats(os.path.join(self.directory, filename))
+
+
+profiler = _SlowRequestProfiler(PROFILE_SAMPLE_RATE, PROFILE_SLOW_REQUEST_MS / 1000, PROFILE_DIR)
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware that times every request, adds a Server-Timing header with
+    the named spans recorded so far, and feeds the per-route metrics.
+    """
+
+    def __init__(self, app, skip_paths=("/static",)):
+        self.app = app
+        self.skip_paths = tuple(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_paths):
+            await self.app(scope, receive, send)
+            return
+
+        spans = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter()
+        status_code = 500
+        profile = profiler.start()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                header = server_timing(spans, time.perf_counter() - start)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = time.perf_counter() - start
+            _request_spans.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            if profile is not None:
+                profiler.stop(profile, route_path, duration)
+            metrics.record(scope["method"], route_path, status_code, duration, spans)
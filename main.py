@@ -1,21 +1,53 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from .auth import auth_middleware
-from .routes import employee_routes, auth_routes
-app = FastAPI()
+from .auth import AuthCookieMiddleware
+from .routes import employee_routes, auth_routes, employer_routes, metrics_routes
+from .instrumentation import TimingMiddleware
+from .executor import analysis_pool
+from .analysis import get_feature_store
+from .skill_index import candidate_index
+from .repositories import close_repositories
+from .templating import precompile_templates, render_version, TEMPLATE_PRECOMPILE
+from .http_cache import set_render_version
+from .assets import AssetFiles, ASSET_BUILD_DIR, prepare_assets
 
 
-# Mount the static files directory
-app.mount("/static", StaticFiles(directory="./employee_repo/static"), name="static")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fingerprint and compress static files before templates start linking to them
+    prepare_assets()
+    # Templates are shared with the routers; compile them all before serving
+    if TEMPLATE_PRECOMPILE:
+        precompile_templates()
+    # Page validators change with the deployed templates and assets, not only the data
+    set_render_version(*render_version())
+    # Open the feature store here, in the serving process only, and drop resume
+    # features extracted under an older taxonomy
+    feature_store = get_feature_store()
+    if feature_store is not None:
+        feature_store.purge_stale()
+    # Build the employer-side candidate index from every user's latest resume
+    await candidate_index.sync()
+    yield
+    # Stop analysis workers and close backend connections with the app
+    analysis_pool.shutdown()
+    await close_repositories()
 
-# Set up templates
-templates = Jinja2Templates(directory="./employee_repo/templates")
+
+app = FastAPI(lifespan=lifespan)
+
+
+# Mount the built (fingerprinted, precompressed) static files
+app.mount("/static", AssetFiles(directory=ASSET_BUILD_DIR, check_dir=False), name="static")
 
 # Add middleware
-app.middleware("http")(auth_middleware)
+app.add_middleware(AuthCookieMiddleware, skip_paths=("/static",))
+# Added last so it is outermost and its timings cover the whole request
+app.add_middleware(TimingMiddleware, skip_paths=("/static",))
 
 # Include routers
 app.include_router(employee_routes.router)
-app.include_router(auth_routes.router)
\ No newline at end of file
+app.include_router(auth_routes.router)
+app.include_router(employer_routes.router)
+app.include_router(metrics_routes.router)
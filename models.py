@@ -1,4 +1,5 @@
 # models.py
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from .forms import as_form
 
@@ -21,4 +22,18 @@ class EmployeeCreate(EmployeeBase):
 
 @as_form
 class EmployeeUpdate(EmployeeBase):
-    pass
\ No newline at end of file
+    pass
+
+class ResumeSubmission(BaseModel):
+    id: str
+    text: str
+
+class RankResumesRequest(BaseModel):
+    job_description: str
+    resumes: List[ResumeSubmission] = Field(..., min_length=1)
+    top_k: Optional[int] = Field(None, gt=0)
+
+@as_form
+class JobPostingCreate(BaseModel):
+    title: str = Field(..., min_length=1)
+    description: str = Field(..., min_length=1)
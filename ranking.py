@@ -0,0 +1,59 @@
+# ranking.py
+from .skills import skill_matcher
+from .analysis import extract_skills
+from .similarity import score_documents
+
+
+def rank_resumes(job_description, resumes, top_k=None):
+    """
+    Rank many resumes against one job description.
+
+    The job description is parsed once into a skill vector; every resume becomes a
+    row of a skill-presence matrix, and all scores come from a single matrix-vector
+    product. TF-IDF similarity for all resumes likewise comes from one sparse
+    matrix product. `resumes` is a list of (id, text) pairs.
+    """
+    # Imported here so only processes that actually rank pay for loading NumPy
+    import numpy as np
+
+    skill_count = len(skill_matcher.skills)
+    job_skills = extract_skills(job_description)
+
+    job_vector = np.zeros(skill_count, dtype=np.float32)
+    for skill in job_skills:
+        job_vector[skill_matcher.index[skill]] = 1.0
+
+    presence = np.zeros((len(resumes), skill_count), dtype=np.float32)
+    for row, (_, text) in enumerate(resumes):
+        for skill in extract_skills(text):
+            presence[row, skill_matcher.index[skill]] = 1.0
+
+    matched = presence @ job_vector
+    if job_skills:
+        scores = matched / len(job_skills) * 100
+    else:
+        scores = np.zeros(len(resumes), dtype=np.float32)
+
+    similarities = score_documents(job_description, [text for _, text in resumes])
+
+    # Stable sort keeps submission order for equal scores
+    order = np.argsort(-scores, kind='stable')
+    if top_k is not None:
+        order = order[:top_k]
+
+    job_columns = np.flatnonzero(job_vector)
+    results = []
+    for row in order:
+        has_skill = presence[row, job_columns] > 0
+        results.append({
+            "id": resumes[row][0],
+            "score": round(float(scores[row]), 1),
+            "matching_skills": [skill_matcher.skills[c] for c in job_columns[has_skill]],
+            "missing_skills": [skill_matcher.skills[c] for c in job_columns[~has_skill]],
+            "similarity": similarities[row],
+        })
+
+    return {
+        "job_skills": [skill_matcher.skills[c] for c in job_columns],
+        "results": results,
+    }
@@ -0,0 +1,486 @@
+# repositories.py
+import hashlib
+import hmac
+import itertools
+import os
+import secrets
+import time
+import uuid
+import jwt
+from starlette.concurrency import run_in_threadpool
+from . import database
+from .cache import TTLCache
+from .instrumentation import span
+
+SUPABASE_MAX_CONNECTIONS = int(os.getenv('SUPABASE_MAX_CONNECTIONS', '20'))
+SUPABASE_TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', '10'))
+# Worker processes serving the app; uvicorn and gunicorn both default their worker count to it
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+# The employee read cache and its invalidation are per process: with several workers another
+# worker's write shows up only once entries expire, so it is off by default there. 0 disables it
+EMPLOYEE_CACHE_TTL = float(os.getenv('EMPLOYEE_CACHE_TTL', '30' if WEB_CONCURRENCY <= 1 else '0'))
+EMPLOYEE_CACHE_SIZE = int(os.getenv('EMPLOYEE_CACHE_SIZE', '1024'))
+
+
+class BackendError(Exception):
+    """Raised when the data backend rejects a request."""
+
+
+class BackendUnavailable(BackendError):
+    """Raised when the data backend cannot be reached (timeout or connection error)."""
+
+
+# Interfaces used by the routes
+
+class EmployeeRepository:
+    # Upper bound on when data returned by this repository last changed, if known
+    last_modified = None
+
+    async def list_active(self, after_id=None, limit=None, columns=None):
+        """Active employees ordered by id, starting after `after_id` (keyset pagination)."""
+        raise NotImplementedError
+
+    async def get(self, employee_id):
+        raise NotImplementedError
+
+    async def create(self, data):
+        raise NotImplementedError
+
+    async def create_many(self, rows):
+        """Insert several rows in one round trip; all or none are inserted."""
+        raise NotImplementedError
+
+    async def update(self, employee_id, data):
+        raise NotImplementedError
+
+    async def deactivate(self, employee_id):
+        return await self.update(employee_id, {"is_active": False})
+
+
+class CachedEmployeeRepository(EmployeeRepository):
+    """
+    Read cache in front of another EmployeeRepository.
+
+    Listing pages and single records are cached; every write made through this
+    repository invalidates the listing pages and writes the new record through.
+    `last_modified` moves forward on every write and every cache fill, so it is
+    never earlier than the data being served.
+    """
+
+    def __init__(self, backend, maxsize, ttl):
+        self.backend = backend
+        self.pages = TTLCache(maxsize, ttl)
+        self.records = TTLCache(maxsize, ttl)
+        self.last_modified = time.time()
+
+    def _touch(self):
+        self.last_modified = time.time()
+
+    async def list_active(self, after_id=None, limit=None, columns=None):
+        key = (after_id, limit, tuple(columns) if columns else None)
+        rows = self.pages.get(key)
+        if rows is None:
+            rows = await self.backend.list_active(after_id=after_id, limit=limit, columns=columns)
+            self.pages.set(key, rows)
+            self._touch()
+        return rows
+
+    async def get(self, employee_id):
+        row = self.records.get(employee_id)
+        if row is None:
+            row = await self.backend.get(employee_id)
+            if row is not None:
+                self.records.set(employee_id, row)
+                self._touch()
+        return row
+
+    async def create(self, data):
+        row = await self.backend.create(data)
+        self.pages.clear()
+        if row is not None:
+            self.records.set(row["id"], row)
+        self._touch()
+        return row
+
+    async def create_many(self, rows):
+        created = await self.backend.create_many(rows)
+        self.pages.clear()
+        for row in created:
+            self.records.set(row["id"], row)
+        self._touch()
+        return created
+
+    async def update(self, employee_id, data):
+        row = await self.backend.update(employee_id, data)
+        self.pages.clear()
+        if row is not None:
+            self.records.set(employee_id, row)
+        else:
+            self.records.pop(employee_id)
+        self._touch()
+        return row
+
+    def stats(self):
+        return {"pages": self.pages.stats(), "records": self.records.stats()}
+
+
+class JobPostingRepository:
+    async def list_for_employer(self, employer_id):
+        """The employer's postings, newest first."""
+        raise NotImplementedError
+
+    async def get(self, posting_id):
+        raise NotImplementedError
+
+    async def create(self, data):
+        raise NotImplementedError
+
+
+class AuthGateway:
+    async def sign_up(self, email, password):
+        """Create an account and return the user record."""
+        raise NotImplementedError
+
+    async def sign_in(self, email, password):
+        """Return a session dict with at least 'access_token' and 'user'."""
+        raise NotImplementedError
+
+
+class ImageStore:
+    async def exists(self, key):
+        raise NotImplementedError
+
+    async def upload(self, key, content, content_type=None, size=None):
+        """
+        Store content (bytes or an async iterator of bytes) under key; return True if it
+        was stored. Writing an existing key replaces it.
+        """
+        raise NotImplementedError
+
+    def public_url(self, key):
+        raise NotImplementedError
+
+
+# Supabase over pooled async HTTP
+
+class SupabaseHTTP:
+    """One pooled, keep-alive AsyncClient per Supabase project."""
+
+    def __init__(self, url, key):
+        self.url = url.rstrip('/')
+        self.key = key
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Deferred so the in-memory backend never loads httpx
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.url,
+                headers={"apikey": self.key, "Authorization": f"Bearer {self.key}"},
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_MAX_CONNECTIONS,
+                    max_keepalive_connections=SUPABASE_MAX_CONNECTIONS,
+                ),
+                timeout=SUPABASE_TIMEOUT,
+            )
+        return self._client
+
+    async def request(self, method, path, **kwargs):
+        import httpx
+        try:
+            with span("db"):
+                response = await self.client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            raise BackendUnavailable(f"Backend unavailable: {e!r}") from e
+        if response.is_error:
+            raise BackendError(_error_message(response))
+        return response
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _error_message(response):
+    try:
+        body = response.json()
+    except ValueError:
+        return response.text or f"HTTP {response.status_code}"
+    if isinstance(body, dict):
+        for field in ('msg', 'message', 'error_description', 'error'):
+            if body.get(field):
+                return str(body[field])
+    return str(body)
+
+
+class SupabaseEmployeeRepository(EmployeeRepository):
+    def __init__(self, http, table='employees'):
+        self.http = http
+        self.path = f"/rest/v1/{table}"
+
+    async def list_active(self, after_id=None, limit=None, columns=None):
+        params = {"select": ",".join(columns) if columns else "*", "is_active": "eq.true", "order": "id.asc"}
+        if after_id is not None:
+            params["id"] = f"gt.{after_id}"
+        if limit is not None:
+            params["limit"] = str(limit)
+        response = await self.http.request('GET', self.path, params=params)
+        return response.json()
+
+    async def get(self, employee_id):
+        response = await self.http.request('GET', self.path, params={"select": "*", "id": f"eq.{employee_id}"})
+        rows = response.json()
+        return rows[0] if rows else None
+
+    async def create(self, data):
+        response = await self.http.request(
+            'POST', self.path, json=data, headers={"Prefer": "return=representation"}
+        )
+        rows = response.json()
+        return rows[0] if rows else None
+
+    async def create_many(self, rows):
+        # PostgREST turns a JSON array into a single multi-row INSERT
+        response = await self.http.request(
+            'POST', self.path, json=rows, headers={"Prefer": "return=representation"}
+        )
+        return response.json()
+
+    async def update(self, employee_id, data):
+        response = await self.http.request(
+            'PATCH', self.path, params={"id": f"eq.{employee_id}"}, json=data,
+            headers={"Prefer": "return=representation"},
+        )
+        rows = response.json()
+        return rows[0] if rows else None
+
+
+class SupabaseJobPostingRepository(JobPostingRepository):
+    def __init__(self, http, table='job_postings'):
+        self.http = http
+        self.path = f"/rest/v1/{table}"
+
+    async def list_for_employer(self, employer_id):
+        response = await self.http.request(
+            'GET', self.path, params={"select": "*", "employer_id": f"eq.{employer_id}", "order": "id.desc"}
+        )
+        return response.json()
+
+    async def get(self, posting_id):
+        response = await self.http.request('GET', self.path, params={"select": "*", "id": f"eq.{posting_id}"})
+        rows = response.json()
+        return rows[0] if rows else None
+
+    async def create(self, data):
+        response = await self.http.request(
+            'POST', self.path, json=data, headers={"Prefer": "return=representation"}
+        )
+        rows = response.json()
+        return rows[0] if rows else None
+
+
+class SupabaseAuthGateway(AuthGateway):
+    def __init__(self, http):
+        self.http = http
+
+    async def sign_up(self, email, password):
+        response = await self.http.request('POST', "/auth/v1/signup", json={"email": email, "password": password})
+        body = response.json()
+        user = body.get("user", body)
+        if not user or not user.get("id"):
+            raise BackendError("Signup failed")
+        return user
+
+    async def sign_in(self, email, password):
+        response = await self.http.request(
+            'POST', "/auth/v1/token", params={"grant_type": "password"},
+            json={"email": email, "password": password},
+        )
+        session = response.json()
+        if not session.get("access_token") or not session.get("user"):
+            raise BackendError("Login failed")
+        return session
+
+
+class SupabaseImageStore(ImageStore):
+    def __init__(self, http, bucket):
+        self.http = http
+        self.bucket = bucket
+
+    async def exists(self, key):
+        with span("storage"):
+            response = await self.http.client.head(f"/storage/v1/object/public/{self.bucket}/{key}")
+        return response.status_code == 200
+
+    async def upload(self, key, content, content_type=None, size=None):
+        # Keys are content-addressed, so overwriting on a concurrent duplicate upload is harmless
+        headers = {"Content-Type": content_type or "application/octet-stream", "x-upsert": "true"}
+        if size is not None:
+            headers["Content-Length"] = str(size)
+        with span("storage"):
+            response = await self.http.client.post(
+                f"/storage/v1/object/{self.bucket}/{key}", content=content, headers=headers
+            )
+        return response.status_code == 200
+
+    def public_url(self, key):
+        return f"{self.http.url}/storage/v1/object/public/{self.bucket}/{key}"
+
+
+# In-process stand-in backend
+
+class MemoryEmployeeRepository(EmployeeRepository):
+    def __init__(self):
+        self._rows = {}
+        self._ids = itertools.count(1)
+
+    async def list_active(self, after_id=None, limit=None, columns=None):
+        rows = []
+        # Rows are kept in insertion order, which is id order
+        for row in self._rows.values():
+            if not row["is_active"] or (after_id is not None and row["id"] <= after_id):
+                continue
+            rows.append({c: row.get(c) for c in columns} if columns else dict(row))
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+    async def get(self, employee_id):
+        row = self._rows.get(employee_id)
+        return dict(row) if row else None
+
+    async def create(self, data):
+        if any(row["email"] == data.get("email") for row in self._rows.values()):
+            raise BackendError('duplicate key value violates unique constraint "employees_email_key"')
+        row = {"id": next(self._ids), "image_url": None, "is_active": True, **data}
+        self._rows[row["id"]] = row
+        return dict(row)
+
+    async def create_many(self, rows):
+        emails = [row.get("email") for row in rows]
+        existing = {row["email"] for row in self._rows.values()}
+        if len(set(emails)) != len(emails) or existing.intersection(emails):
+            raise BackendError('duplicate key value violates unique constraint "employees_email_key"')
+        return [await self.create(row) for row in rows]
+
+    async def update(self, employee_id, data):
+        row = self._rows.get(employee_id)
+        if row is None:
+            return None
+        row.update(data)
+        return dict(row)
+
+
+class MemoryJobPostingRepository(JobPostingRepository):
+    def __init__(self):
+        self._rows = {}
+        self._ids = itertools.count(1)
+
+    async def list_for_employer(self, employer_id):
+        return [dict(row) for row in reversed(self._rows.values()) if row["employer_id"] == employer_id]
+
+    async def get(self, posting_id):
+        row = self._rows.get(posting_id)
+        return dict(row) if row else None
+
+    async def create(self, data):
+        row = {"id": next(self._ids), "created_at": time.time(), **data}
+        self._rows[row["id"]] = row
+        return dict(row)
+
+
+class MemoryAuthGateway(AuthGateway):
+    """Keeps accounts in memory and issues HS256 tokens that get_current_user accepts."""
+
+    def __init__(self, jwt_secret, token_lifetime=3600):
+        self.jwt_secret = jwt_secret
+        self.token_lifetime = token_lifetime
+        self._users = {}
+
+    @staticmethod
+    async def _hash_password(password, salt):
+        # Deliberately slow; keep it off the event loop so logins do not stall other requests
+        return await run_in_threadpool(hashlib.pbkdf2_hmac, 'sha256', password.encode(), salt, 100_000)
+
+    async def sign_up(self, email, password):
+        if email in self._users:
+            raise BackendError("User already registered")
+        salt = secrets.token_bytes(16)
+        password_hash = await self._hash_password(password, salt)
+        # Checked again: another sign-up for this email may have finished while hashing
+        if email in self._users:
+            raise BackendError("User already registered")
+        user = {"id": str(uuid.uuid4()), "email": email}
+        self._users[email] = (user, salt, password_hash)
+        return dict(user)
+
+    async def sign_in(self, email, password):
+        record = self._users.get(email)
+        if record is None or not hmac.compare_digest(record[2], await self._hash_password(password, record[1])):
+            raise BackendError("Invalid login credentials")
+        user = record[0]
+        now = int(time.time())
+        access_token = jwt.encode(
+            {"sub": user["id"], "email": email, "role": "authenticated", "iat": now, "exp": now + self.token_lifetime},
+            self.jwt_secret, algorithm='HS256',
+        )
+        return {"access_token": access_token, "token_type": "bearer", "user": dict(user)}
+
+
+class MemoryImageStore(ImageStore):
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self._objects = {}
+
+    async def exists(self, key):
+        return key in self._objects
+
+    async def upload(self, key, content, content_type=None, size=None):
+        if not isinstance(content, (bytes, bytearray)):
+            content = b"".join([chunk async for chunk in content])
+        self._objects[key] = (content_type, bytes(content))
+        return True
+
+    def public_url(self, key):
+        return f"memory://{self.bucket}/{key}"
+
+
+def _with_read_cache(repository):
+    if EMPLOYEE_CACHE_TTL <= 0:
+        return repository
+    return CachedEmployeeRepository(repository, EMPLOYEE_CACHE_SIZE, EMPLOYEE_CACHE_TTL)
+
+
+def _build_backend():
+    if database.DATA_BACKEND == 'memory':
+        return (
+            _with_read_cache(MemoryEmployeeRepository()),
+            MemoryAuthGateway(database.SUPABASE_JWT_SECRET),
+            MemoryAuthGateway(database.SUPABASE_JWT_SECRET_EMPLOYER),
+            MemoryImageStore(database.SUPABASE_BUCKET or 'images'),
+            MemoryJobPostingRepository(),
+            [],
+        )
+    http = SupabaseHTTP(database.SUPABASE_URL, database.SUPABASE_KEY)
+    employer_http = SupabaseHTTP(database.SUPABASE_URL_EMPLOYER, database.SUPABASE_KEY_EMPLOYER)
+    return (
+        _with_read_cache(SupabaseEmployeeRepository(http)),
+        SupabaseAuthGateway(http),
+        SupabaseAuthGateway(employer_http),
+        SupabaseImageStore(http, database.SUPABASE_BUCKET),
+        SupabaseJobPostingRepository(employer_http),
+        [http, employer_http],
+    )
+
+
+(
+    employee_repository, auth_gateway, employer_auth_gateway, image_store, job_posting_repository, _http_clients,
+) = _build_backend()
+
+
+async def close_repositories():
+    for http in _http_clients:
+        await http.aclose()
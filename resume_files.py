@@ -0,0 +1,165 @@
+# resume_files.py
+import mmap
+import os
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from .cache import TTLCache
+from .executor import analysis_pool
+from .instrumentation import span
+from .uploads import iter_upload, hash_upload
+
+RESUME_MAX_BYTES = int(os.getenv('RESUME_MAX_BYTES', str(10 * 1024 * 1024)))
+RESUME_MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', '20'))
+# Extracted text beyond this is cut off
+RESUME_MAX_CHARS = int(os.getenv('RESUME_MAX_CHARS', '200000'))
+# Uncompressed size allowed for a DOCX body, so a small zip cannot inflate without bound
+RESUME_MAX_XML_BYTES = int(os.getenv('RESUME_MAX_XML_BYTES', str(50 * 1024 * 1024)))
+RESUME_TEXT_CACHE_SIZE = int(os.getenv('RESUME_TEXT_CACHE_SIZE', '256'))
+RESUME_TEXT_CACHE_TTL = float(os.getenv('RESUME_TEXT_CACHE_TTL', '86400'))
+
+FORMATS = ('pdf', 'docx')
+
+_WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+# Run-level elements that carry text, and what each one contributes
+_DOCX_TEXT_TAGS = {f'{_WORD_NS}t': None, f'{_WORD_NS}tab': '\t', f'{_WORD_NS}br': '\n'}
+
+# Extracted text keyed by file hash, so uploading the same file again skips parsing
+text_cache = TTLCache(RESUME_TEXT_CACHE_SIZE, RESUME_TEXT_CACHE_TTL)
+
+
+class ResumeFileError(Exception):
+    """A resume file that cannot be read; carries the HTTP status to answer with."""
+
+    def __init__(self, detail, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY):
+        super().__init__(detail, status_code)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def detect_format(filename, content_type=None):
+    name = (filename or '').lower()
+    if name.endswith('.pdf') or content_type == 'application/pdf':
+        return 'pdf'
+    if name.endswith('.docx') or content_type == _DOCX_CONTENT_TYPE:
+        return 'docx'
+    return None
+
+
+def _extract_pdf(path, max_pages, max_chars):
+    try:
+        # Optional dependency, only needed once someone uploads a PDF
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+    except ImportError:
+        raise ResumeFileError("PDF uploads are not supported on this server",
+                              status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    try:
+        # Reading from the mapping lets the OS page the file in instead of copying it
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            reader = PdfReader(data)
+            if len(reader.pages) > max_pages:
+                raise ResumeFileError(f"Resume has more than {max_pages} pages",
+                                      status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            parts = []
+            length = 0
+            for page in reader.pages:
+                text = page.extract_text() or ''
+                parts.append(text)
+                length += len(text)
+                if length >= max_chars:
+                    break
+    except (PdfReadError, ValueError, KeyError) as e:
+        raise ResumeFileError(f"Could not read the PDF: {e}")
+    return '\n'.join(parts)[:max_chars]
+
+
+def _extract_docx(path, max_chars):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            if archive.getinfo('word/document.xml').file_size > RESUME_MAX_XML_BYTES:
+                raise ResumeFileError("The DOCX file is too large once uncompressed",
+                                      status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            paragraphs = []
+            length = 0
+            with archive.open('word/document.xml') as document:
+                # iterparse keeps only the current paragraph in memory
+                for _, element in ElementTree.iterparse(document):
+                    if element.tag != f'{_WORD_NS}p':
+                        continue
+                    text = ''.join(
+                        _DOCX_TEXT_TAGS[node.tag] or node.text or ''
+                        for node in element.iter() if node.tag in _DOCX_TEXT_TAGS
+                    )
+                    element.clear()
+                    paragraphs.append(text)
+                    length += len(text) + 1
+                    if length >= max_chars:
+                        break
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise ResumeFileError(f"Could not read the DOCX file: {e}")
+    return '\n'.join(paragraphs)[:max_chars]
+
+
+def extract_text(path, fmt, max_pages=RESUME_MAX_PAGES, max_chars=RESUME_MAX_CHARS):
+    """
+    Extract plain text from a PDF or DOCX file on disk.
+
+    Module-level and picklable so it can run in a worker process.
+    """
+    if fmt == 'pdf':
+        return _extract_pdf(path, max_pages, max_chars)
+    if fmt == 'docx':
+        return _extract_docx(path, max_chars)
+    raise ResumeFileError(f"Unsupported resume format: {fmt}", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+
+async def spool_upload(upload: UploadFile, suffix=''):
+    """Copy an upload into a named temp file chunk by chunk and return its path; the caller removes it."""
+    spooled = await run_in_threadpool(tempfile.NamedTemporaryFile, suffix=suffix, delete=False)
+    try:
+        async for chunk in iter_upload(upload):
+            await run_in_threadpool(spooled.write, chunk)
+        await run_in_threadpool(spooled.close)
+    except BaseException:
+        spooled.close()
+        os.unlink(spooled.name)
+        raise
+    return spooled.name
+
+
+async def extract_resume_text(upload: UploadFile):
+    """
+    Text of an uploaded PDF or DOCX resume.
+
+    The upload is hashed first and a re-upload is answered from the text cache.
+    Otherwise it is spooled to a temp file and parsed in the analysis pool, never
+    on the event loop.
+    """
+    fmt = detect_format(upload.filename, upload.content_type)
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Upload the resume as a .pdf or .docx file")
+
+    digest, _ = await hash_upload(upload, RESUME_MAX_BYTES)
+    key = (digest, fmt, RESUME_MAX_PAGES, RESUME_MAX_CHARS)
+    text = text_cache.get(key)
+    if text is None:
+        path = await spool_upload(upload, suffix=f'.{fmt}')
+        try:
+            with span("extract"):
+                text = await analysis_pool.run(extract_text, path, fmt, RESUME_MAX_PAGES, RESUME_MAX_CHARS)
+        except ResumeFileError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        finally:
+            os.unlink(path)
+        text_cache.set(key, text)
+
+    if not text.strip():
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="No text could be extracted from the resume file")
+    return text
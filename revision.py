@@ -0,0 +1,156 @@
+# revision.py
+import re
+from html import escape
+from typing import NamedTuple
+from .skills import skill_matcher
+
+# Common action verbs to suggest
+SUGGESTED_VERBS = ['developed', 'implemented', 'managed', 'led', 'created', 'designed',
+                   'built', 'optimized', 'increased', 'decreased', 'improved', 'delivered',
+                   'coordinated', 'facilitated', 'established', 'launched', 'streamlined']
+
+WEAK_VERBS = ['did', 'worked on', 'helped with', 'was involved in', 'participated in']
+
+# Patterns are compiled once; every line is scanned by each of them at most once
+_WEAK_VERB_RE = re.compile(r'\b(?:' + '|'.join(re.escape(verb) for verb in WEAK_VERBS) + r')\b', re.IGNORECASE)
+_DIGIT_RE = re.compile(r'\d')
+
+_SKILL_HINT_WORDS = ('experience', 'skills', 'proficient', 'knowledge')
+_ACHIEVEMENT_WORDS = ('managed', 'led', 'increased', 'improved', 'developed')
+
+
+class AnnotationContext(NamedTuple):
+    """Everything a line needs from the whole-document analysis, computed once per resume."""
+    job_skills: frozenset
+    candidate_verbs: tuple
+    missing_skills_html: str
+
+
+def build_annotation_context(job_skills, missing_skills, found_verbs):
+    # Missing skills are by definition absent from every resume line, so the
+    # suggestion suffix is the same wherever it is added and can be built once.
+    missing_skills_html = ''.join(
+        f' <span class="suggestion-add">[Consider adding: {escape(skill.title())}]</span>'
+        for skill in sorted(missing_skills)
+    )
+    return AnnotationContext(
+        job_skills=frozenset(job_skills),
+        candidate_verbs=tuple(verb for verb in SUGGESTED_VERBS if verb not in found_verbs),
+        missing_skills_html=missing_skills_html,
+    )
+
+
+def annotate_line(line, context):
+    """
+    Annotate a single (already stripped, non-empty) resume line.
+
+    Skill matches and weak verbs are collected as spans in one scan each, then the
+    line is emitted once with every annotation applied.
+    """
+    line_lower = line.lower()
+    spans = []
+
+    for match in skill_matcher.find(line):
+        if match.skill in context.job_skills:
+            spans.append((match.start, match.end,
+                          f'<span class="skill-match">{escape(line[match.start:match.end])}</span>'))
+
+    # Find a better action verb that is not already used
+    better_verb = next((verb for verb in context.candidate_verbs if verb not in line_lower), None)
+    if better_verb:
+        for match in _WEAK_VERB_RE.finditer(line):
+            spans.append((match.start(), match.end(),
+                          f'<span class="suggestion-verb">{escape(match.group())}</span> → '
+                          f'<span class="suggestion-improvement">{better_verb}</span>'))
+
+    spans.sort()
+    parts = []
+    position = 0
+    for start, end, html in spans:
+        if start < position:
+            # Overlapping span; the earlier annotation wins
+            continue
+        parts.append(escape(line[position:start]))
+        parts.append(html)
+        position = end
+    parts.append(escape(line[position:]))
+
+    # Suggest adding missing skills where the line talks about skills
+    if context.missing_skills_html and any(word in line_lower for word in _SKILL_HINT_WORDS):
+        parts.append(context.missing_skills_html)
+
+    # Suggest quantification
+    if not _DIGIT_RE.search(line) and any(word in line_lower for word in _ACHIEVEMENT_WORDS):
+        if 'team' in line_lower:
+            parts.append(' <span class="suggestion-quantify">[Add: "team of X people"]</span>')
+        elif 'project' in line_lower:
+            parts.append(' <span class="suggestion-quantify">[Add: "X projects"]</span>')
+        elif 'increase' in line_lower or 'improve' in line_lower:
+            parts.append(' <span class="suggestion-quantify">[Add: "by X%"]</span>')
+        else:
+            parts.append(' <span class="suggestion-quantify">[Add specific metrics]</span>')
+
+    return ''.join(parts)
+
+
+def improvement_summary_html(resume, missing_skills, found_verbs):
+    improvement_summary = []
+
+    if missing_skills:
+        improvement_summary.append(f"<strong>Add these skills:</strong> {', '.join(sorted(missing_skills))}")
+
+    if len(found_verbs) < 5:
+        improvement_summary.append("<strong>Use more action verbs:</strong> " +
+                                   ", ".join([v for v in SUGGESTED_VERBS if v not in found_verbs][:5]))
+
+    if not _DIGIT_RE.search(resume):
+        improvement_summary.append("<strong>Add quantification:</strong> Include specific numbers and metrics")
+
+    if not improvement_summary:
+        return ""
+    return f"""
+<div class="improvement-summary">
+<h4>🎯 Key Improvements Suggested:</h4>
+<ul>
+{''.join([f'<li>{item}</li>' for item in improvement_summary])}
+</ul>
+</div>
+"""
+
+
+def iter_revised_resume(resume, job_skills, missing_skills, found_verbs, annotate=None):
+    """
+    Yield the revised resume piece by piece: the improvement summary first, then the
+    annotated lines one section (run of lines up to a blank line) at a time.
+    Joined, the pieces are exactly generate_revised_resume()'s output.
+
+    `annotate(line)` replaces annotate_line() for callers that reuse earlier annotations.
+    """
+    if annotate is None:
+        context = build_annotation_context(job_skills, missing_skills, found_verbs)
+        annotate = lambda line: annotate_line(line, context)
+
+    yield f"""
+{improvement_summary_html(resume, missing_skills, found_verbs)}
+<div class="resume-content">
+"""
+    section = []
+    for i, line in enumerate(resume.split('\n')):
+        stripped = line.strip()
+        if i:
+            section.append('\n')
+        section.append(annotate(stripped) if stripped else line)
+        if not stripped and len(section) > 1:
+            yield ''.join(section)
+            section = []
+    section.append("""
+</div>
+""")
+    yield ''.join(section)
+
+
+def generate_revised_resume(resume, job_skills, missing_skills, action_verbs, found_verbs, annotate=None):
+    """
+    Generate a revised version of the resume with suggested improvements highlighted
+    """
+    return ''.join(iter_revised_resume(resume, job_skills, missing_skills, found_verbs, annotate))
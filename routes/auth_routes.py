@@ -1,12 +1,12 @@
 # routes/auth_routes.py
-from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi import APIRouter, Request, Form, HTTPException, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from ..database import supabase, supabase_employer
-from fastapi.templating import Jinja2Templates
+from ..repositories import auth_gateway, employer_auth_gateway
+from ..auth import get_current_user, token_cache_stats
+from ..templating import templates
 from starlette.responses import Response
 
 router = APIRouter()
-templates = Jinja2Templates(directory="./employee_repo/templates")
 
 @router.get("/signup", response_class=HTMLResponse)
 async def signup_form(request: Request):
@@ -19,12 +19,7 @@ async def employer_form(request: Request):
 @router.post("/signup")
 async def signup(email: str = Form(...), password: str = Form(...)):
     try:
-        auth_response = supabase.auth.sign_up({
-            'email': email,
-            'password': password
-        })
-        if auth_response.user is None:
-            raise HTTPException(status_code=400, detail="Signup failed")
+        await auth_gateway.sign_up(email, password)
         return RedirectResponse("/login", status_code=303)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -33,12 +28,7 @@ async def signup(email: str = Form(...), password: str = Form(...)):
 async def signup(email: str = Form(...), password: str = Form(...)):
     try:
         print("test")
-        auth_response = supabase_employer.auth.sign_up({
-            'email': email,
-            'password': password
-        })
-        if auth_response.user is None:
-            raise HTTPException(status_code=400, detail="Signup failed")
+        await employer_auth_gateway.sign_up(email, password)
         return RedirectResponse("/login_employer", status_code=303)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -54,14 +44,9 @@ async def login_form(request: Request):
 @router.post("/login")
 async def login(response: Response, email: str = Form(...), password: str = Form(...)):
     try:
-        auth_response = supabase.auth.sign_in_with_password({
-            'email': email,
-            'password': password
-        })
-        if auth_response.user is None:
-            raise HTTPException(status_code=400, detail="Login failed")
+        session = await auth_gateway.sign_in(email, password)
         # Set token in cookies
-        access_token = auth_response.session.access_token
+        access_token = session["access_token"]
         response = RedirectResponse("/", status_code=303)
         response.set_cookie(key="access_token", value=f"Bearer {access_token}", httponly=True)
         return response
@@ -71,15 +56,10 @@ async def login(response: Response, email: str = Form(...), password: str = Form
 @router.post("/login_employer")
 async def login(response: Response, email: str = Form(...), password: str = Form(...)):
     try:
-        auth_response = supabase_employer.auth.sign_in_with_password({
-            'email': email,
-            'password': password
-        })
+        session = await employer_auth_gateway.sign_in(email, password)
         print("hello")
-        if auth_response.user is None:
-            raise HTTPException(status_code=400, detail="Login failed")
         # Set token in cookies
-        access_token = auth_response.session.access_token
+        access_token = session["access_token"]
         response = RedirectResponse("/employer_homepage", status_code=303)
         response.set_cookie(key="access_token", value=f"Bearer {access_token}", httponly=True)
         return response
@@ -90,4 +70,8 @@ async def login(response: Response, email: str = Form(...), password: str = Form
 async def logout(response: Response):
     response = RedirectResponse("/login", status_code=303)
     response.delete_cookie(key="access_token")
-    return response
\ No newline at end of file
+    return response
+
+@router.get("/auth/cache-stats")
+async def auth_cache_stats(current_user: dict = Depends(get_current_user)):
+    return token_cache_stats()
@@ -0,0 +1,50 @@
+# routes/employer_routes.py
+import os
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, RedirectResponse
+from ..repositories import job_posting_repository
+from ..auth import get_current_employer
+from ..models import JobPostingCreate
+from ..analysis import extract_skills, normalize_text
+from ..skill_index import candidate_index
+from ..templating import templates
+from ..instrumentation import span
+
+router = APIRouter(prefix="/employer")
+
+CANDIDATES_DEFAULT_K = int(os.getenv('CANDIDATES_DEFAULT_K', '10'))
+CANDIDATES_MAX_K = int(os.getenv('CANDIDATES_MAX_K', '100'))
+
+@router.get("/postings", response_class=HTMLResponse)
+async def list_postings(request: Request, current_employer: dict = Depends(get_current_employer)):
+    postings = await job_posting_repository.list_for_employer(current_employer['sub'])
+    return templates.TemplateResponse("employer_postings.html", {"request": request, "postings": postings})
+
+@router.post("/postings")
+async def create_posting(
+    posting: JobPostingCreate = Depends(JobPostingCreate.as_form),
+    current_employer: dict = Depends(get_current_employer)
+):
+    description = normalize_text(posting.description)
+    # Skills are extracted once here, the same way /analyze-resume reads a job description
+    await job_posting_repository.create({
+        "employer_id": current_employer['sub'],
+        "title": posting.title,
+        "description": description,
+        "skills": sorted(extract_skills(description)),
+    })
+    return RedirectResponse("/employer/postings", status_code=303)
+
+@router.get("/postings/{posting_id}/candidates")
+async def posting_candidates(
+    posting_id: int,
+    k: int = Query(CANDIDATES_DEFAULT_K, ge=1, le=CANDIDATES_MAX_K),
+    current_employer: dict = Depends(get_current_employer)
+):
+    posting = await job_posting_repository.get(posting_id)
+    if not posting or posting["employer_id"] != current_employer['sub']:
+        raise HTTPException(status_code=404, detail="Job posting not found")
+    with span("analysis"):
+        await candidate_index.sync()
+        results = candidate_index.top_k(posting["skills"], k)
+    return {"posting_id": posting_id, "job_skills": posting["skills"], "results": results}
@@ -0,0 +1,40 @@
+# routes/metrics_routes.py
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from ..instrumentation import metrics
+from ..analysis import analysis_cache, skill_cache
+from ..auth import token_cache, rejected_token_cache
+from ..executor import analysis_pool
+from ..repositories import employee_repository, CachedEmployeeRepository
+
+router = APIRouter()
+
+# Optional shared secret for scrapers; the endpoint is open when unset
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+_caches = {
+    "analysis": analysis_cache,
+    "skills": skill_cache,
+    "jwt_verified": token_cache,
+    "jwt_rejected": rejected_token_cache,
+}
+if isinstance(employee_repository, CachedEmployeeRepository):
+    _caches["employee_pages"] = employee_repository.pages
+    _caches["employee_records"] = employee_repository.records
+
+for _counter in ('hits', 'misses', 'evictions'):
+    metrics.register_counters(
+        f"cache_{_counter}_total", f"Cache {_counter} by cache.",
+        lambda counter=_counter: {f'cache="{name}"': getattr(cache, counter) for name, cache in _caches.items()},
+    )
+metrics.register_counters(
+    "analysis_pool_jobs_total", "Analysis worker pool jobs by outcome.",
+    lambda: {f'outcome="{outcome}"': getattr(analysis_pool, outcome) for outcome in ('completed', 'rejected', 'timeouts')},
+)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
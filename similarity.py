@@ -0,0 +1,210 @@
+# similarity.py
+"""
+TF-IDF text similarity between resumes and job descriptions.
+
+Complements the skill-list match: every word of both documents counts, weighted by
+how rare it is across a reference corpus. The vocabulary and IDF weights are fitted
+once and saved to SIMILARITY_MODEL_PATH:
+
+    python -m employee_repo.similarity fit jobs.ndjson resumes/*.txt [--output PATH]
+
+Without a saved model every term weighs the same (IDF of 1), i.e. plain
+term-frequency cosine. IDF is never fitted on the few documents of one request: with
+two documents a shared term would weigh less than an unshared one, pulling scores
+down in a way that differs from request to request.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from collections import Counter
+from functools import lru_cache
+from .skills import skill_matcher
+
+SIMILARITY_MODEL_PATH = os.getenv('SIMILARITY_MODEL_PATH', './similarity_model.json')
+SIMILARITY_TOP_TERMS = int(os.getenv('SIMILARITY_TOP_TERMS', '10'))
+
+# Bump when saved models stop matching tokenize() (2: terms come from the skill matcher)
+MODEL_FORMAT_VERSION = 2
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each etc few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not of off on once only or other
+our ours out over own per same she should so some such than that the their theirs them then there these they
+this those through to too under until up very via was we were what when where which while who whom why will
+with within without would you your yours
+""".split())
+
+
+def tokenize(text):
+    """
+    Terms of text, split exactly as the skill matcher splits it ('Python3' -> 'python',
+    'ReactJS' -> 'react', 'js'; 'c++' and 'c#' stay whole) so both scores agree on vocabulary.
+    """
+    return [
+        token for token, _, _ in skill_matcher.tokenize(text)
+        if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()
+    ]
+
+
+def term_counts(text):
+    """Occurrences of each term in text; all a document's similarity row is built from."""
+    return dict(Counter(tokenize(text)))
+
+
+class TfidfModel:
+    """Vocabulary plus smoothed IDF weights; documents become L2-normalized sparse rows."""
+
+    def __init__(self, vocabulary, idf, documents=0):
+        import numpy as np
+        self.terms = list(vocabulary)
+        self.vocabulary = {term: i for i, term in enumerate(self.terms)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.documents = documents
+
+    @classmethod
+    def fit(cls, texts, min_df=1, max_features=None):
+        document_frequency = Counter()
+        count = 0
+        for text in texts:
+            document_frequency.update(set(tokenize(text)))
+            count += 1
+        terms = [term for term, df in document_frequency.items() if df >= min_df]
+        if max_features is not None:
+            # Keep the most common terms; ties broken alphabetically so fits are reproducible
+            terms = sorted(terms, key=lambda term: (-document_frequency[term], term))[:max_features]
+        terms.sort()
+        idf = [math.log((1 + count) / (1 + document_frequency[term])) + 1 for term in terms]
+        return cls(terms, idf, count)
+
+    @classmethod
+    def unweighted(cls, documents):
+        """
+        Model over the terms of `documents` (term_counts() dicts) with every IDF weight 1,
+        for use without a fitted model.
+        """
+        terms = sorted(set().union(*documents))
+        return cls(terms, [1.0] * len(terms))
+
+    def transform(self, texts):
+        """One CSR row per text: sublinear term frequency times IDF, scaled to unit length."""
+        return self.transform_counts([term_counts(text) for text in texts])
+
+    def transform_counts(self, documents):
+        """transform() for documents already reduced to term_counts() dicts."""
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        indptr = [0]
+        indices = []
+        data = []
+        for counts in documents:
+            for term, n in counts.items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    indices.append(column)
+                    data.append(1.0 + math.log(n))
+            indptr.append(len(indices))
+        matrix = csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(indptr) - 1, len(self.terms)),
+        )
+        matrix = matrix.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return csr_matrix(matrix.multiply((1.0 / norms)[:, None]))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({
+                "format": MODEL_FORMAT_VERSION,
+                "documents": self.documents,
+                "vocabulary": self.terms,
+                "idf": [round(float(weight), 6) for weight in self.idf],
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            saved = json.load(f)
+        if saved.get("format") != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported similarity model format in {path}; fit it again")
+        return cls(saved["vocabulary"], saved["idf"], saved["documents"])
+
+
+@lru_cache(maxsize=None)
+def get_model():
+    """The saved model, loaded once per process; None when none has been fitted."""
+    if not SIMILARITY_MODEL_PATH or not os.path.exists(SIMILARITY_MODEL_PATH):
+        return None
+    return TfidfModel.load(SIMILARITY_MODEL_PATH)
+
+
+def score_documents(job_description, documents, top_terms=SIMILARITY_TOP_TERMS):
+    """
+    Cosine similarity of each document to the job description, as
+    [{score (0-100), top_terms}] in document order. All documents are scored with
+    one sparse matrix-vector product; top_terms are the shared terms that contribute
+    most to each score.
+    """
+    return score_term_counts(job_description, [term_counts(document) for document in documents], top_terms)
+
+
+def score_term_counts(job_description, documents, top_terms=SIMILARITY_TOP_TERMS):
+    """
+    score_documents() for documents already reduced to term_counts() dicts (e.g. kept
+    with a resume's stored features), so only the job description is tokenized.
+    """
+    import numpy as np
+
+    job_counts = term_counts(job_description)
+    model = get_model() or TfidfModel.unweighted([job_counts, *documents])
+    job_vector = model.transform_counts([job_counts])
+    matrix = model.transform_counts(documents)
+    scores = np.asarray((matrix @ job_vector.T).todense()).ravel()
+    contributions = matrix.multiply(job_vector).tocsr()
+
+    results = []
+    for row, score in enumerate(scores):
+        start, end = contributions.indptr[row], contributions.indptr[row + 1]
+        weights = contributions.data[start:end]
+        best = np.argsort(-weights, kind='stable')[:top_terms]
+        results.append({
+            "score": round(float(score) * 100, 1),
+            "top_terms": [model.terms[contributions.indices[start + i]] for i in best if weights[i] > 0],
+        })
+    return results
+
+
+def _iter_corpus(paths):
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            if path.endswith(('.ndjson', '.jsonl')):
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        yield record["text"] if isinstance(record, dict) else str(record)
+            else:
+                yield f.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    fit = commands.add_parser('fit', help="fit vocabulary and IDF on a corpus and save them")
+    fit.add_argument('paths', nargs='+', help=".txt files (one document each) or .ndjson files with a 'text' field")
+    fit.add_argument('--output', default=SIMILARITY_MODEL_PATH)
+    fit.add_argument('--min-df', type=int, default=2, help="ignore terms found in fewer documents")
+    fit.add_argument('--max-features', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    model = TfidfModel.fit(_iter_corpus(args.paths), min_df=args.min_df, max_features=args.max_features)
+    model.save(args.output)
+    print(f"Fitted {len(model.terms)} terms on {model.documents} documents -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
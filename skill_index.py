@@ -0,0 +1,99 @@
+# skill_index.py
+import heapq
+from collections import defaultdict
+from starlette.concurrency import run_in_threadpool
+from .analysis import get_feature_store
+
+
+class SkillIndex:
+    """
+    Inverted index from skill to the candidates whose latest resume has it.
+
+    A posting is scored by walking only the candidate lists of its own skills, so the
+    work grows with the number of candidates that share at least one skill with the
+    posting, not with the number of candidates overall. Candidates are re-indexed
+    one at a time as their resume changes.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(set)    # skill -> candidate ids
+        self.candidates = {}                # candidate id -> frozenset of skills
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def update(self, candidate_id, skills):
+        skills = frozenset(skills)
+        previous = self.candidates.get(candidate_id, frozenset())
+        for skill in previous - skills:
+            self._discard(skill, candidate_id)
+        for skill in skills - previous:
+            self.postings[skill].add(candidate_id)
+        self.candidates[candidate_id] = skills
+
+    def remove(self, candidate_id):
+        for skill in self.candidates.pop(candidate_id, frozenset()):
+            self._discard(skill, candidate_id)
+
+    def _discard(self, skill, candidate_id):
+        holders = self.postings.get(skill)
+        if holders is not None:
+            holders.discard(candidate_id)
+            if not holders:
+                del self.postings[skill]
+
+    def top_k(self, skills, k):
+        """
+        The k candidates covering the most of `skills`, best first, as
+        {id, score, matching_skills, missing_skills} with the same score as the
+        resume analysis (percentage of the posting's skills matched).
+        """
+        skills = sorted(set(skills))
+        if not skills or k <= 0:
+            return []
+        matched = defaultdict(int)
+        for skill in skills:
+            for candidate_id in self.postings.get(skill, ()):
+                matched[candidate_id] += 1
+        # Ties go to the smaller id so results are stable between calls
+        best = heapq.nsmallest(k, matched.items(), key=lambda item: (-item[1], item[0]))
+
+        results = []
+        for candidate_id, count in best:
+            has = self.candidates[candidate_id]
+            results.append({
+                "id": candidate_id,
+                "score": round(count / len(skills) * 100, 1),
+                "matching_skills": [skill for skill in skills if skill in has],
+                "missing_skills": [skill for skill in skills if skill not in has],
+            })
+        return results
+
+
+class CandidateIndex(SkillIndex):
+    """
+    SkillIndex over each user's latest analyzed resume, fed from the feature store.
+
+    sync() pulls only records changed since the previous sync (by the store's change
+    sequence, not by timestamp), so other workers' submissions show up too and a
+    refresh costs nothing when nothing changed.
+    """
+
+    def __init__(self, open_store):
+        super().__init__()
+        # Called on each sync rather than at import, so importing this module opens nothing
+        self.open_store = open_store
+        self.synced_seq = 0
+
+    async def sync(self):
+        store = self.open_store()
+        if store is None:
+            return 0
+        rows = await run_in_threadpool(store.latest_since, self.synced_seq)
+        for user_id, features, seq in rows:
+            self.update(user_id, features["skills"])
+            self.synced_seq = max(self.synced_seq, seq)
+        return len(rows)
+
+
+candidate_index = CandidateIndex(get_feature_store)
@@ -0,0 +1,117 @@
+# skills.py
+import hashlib
+import json
+import re
+from typing import NamedTuple
+
+# Skill taxonomy used when analyzing resumes and job descriptions
+TECHNICAL_SKILLS = {
+    'programming': ['python', 'java', 'javascript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin', 'scala'],
+    'databases': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'oracle', 'sqlite', 'dynamodb'],
+    'frameworks': ['django', 'flask', 'fastapi', 'spring', 'react', 'angular', 'vue', 'node.js', 'express', 'laravel'],
+    'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'gitlab'],
+    'tools': ['git', 'github', 'jira', 'confluence', 'slack', 'figma', 'postman', 'swagger']
+}
+
+SOFT_SKILLS = ['leadership', 'communication', 'teamwork', 'problem solving', 'analytical', 'creative', 'organized', 'detail-oriented', 'time management', 'collaboration']
+
+TAXONOMY = {**TECHNICAL_SKILLS, 'soft': SOFT_SKILLS}
+
+# Changes whenever the taxonomy does; stored features extracted under another version are stale
+TAXONOMY_VERSION = hashlib.sha256(json.dumps(TAXONOMY, sort_keys=True).encode()).hexdigest()[:16]
+
+# Letter runs and digit runs are separate tokens, so 'Python3' and 'python2.7' still
+# read as 'python'. '++' or '#' right after letters is kept on the token only when that
+# spelling is a skill ('c++', 'c#'); anywhere else they separate tokens like any other
+# punctuation, so 'Python+Django' and '#kubernetes' split cleanly.
+_TOKEN_RE = re.compile(r"([a-z]+)(\+\+|#)?|[0-9]+", re.IGNORECASE)
+# 'ReactJS' / 'nodejs' are written as one word; split the suffix off a known stem
+_JS_SUFFIX = 'js'
+_END = None
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    category: str
+    start: int
+    end: int
+
+
+class SkillMatcher:
+    """
+    Token trie built once over the skill taxonomy.
+
+    A document is tokenized a single time and the trie is walked from each token,
+    keeping the longest skill that ends on a token boundary. Cost is linear in the
+    document length (times the longest skill, in tokens) and does not grow with the
+    number of skills. Matching whole tokens means 'go' no longer hits 'good' and
+    'git' no longer hits 'digital', while 'Python3', 'C++17' and 'ReactJS' still match.
+    """
+
+    def __init__(self, taxonomy):
+        self._root = {}
+        self._suffixed = set()
+        self.categories = {}
+        for category, skills in taxonomy.items():
+            for skill in skills:
+                node = self._root
+                for m in _TOKEN_RE.finditer(skill.lower()):
+                    token = m.group()
+                    if m.group(2):
+                        self._suffixed.add(token)
+                    node = node.setdefault(token, {})
+                node[_END] = skill
+                self.categories[skill] = category
+        self.skills = list(self.categories)
+        # Column of each skill in skill-presence vectors/matrices
+        self.index = {skill: i for i, skill in enumerate(self.skills)}
+
+    def tokenize(self, text):
+        """Return (token, start, end) for each token of text, lowercased."""
+        tokens = []
+        for m in _TOKEN_RE.finditer(text):
+            token = m.group().lower()
+            if m.group(1) is None:
+                tokens.append((token, m.start(), m.end()))
+                continue
+            if m.group(2) and token not in self._suffixed:
+                token = token[:m.end(1) - m.start()]
+            end = m.start() + len(token)
+            stem = token[:-len(_JS_SUFFIX)]
+            if token.endswith(_JS_SUFFIX) and stem in self._root:
+                tokens.append((stem, m.start(), m.start() + len(stem)))
+                tokens.append((_JS_SUFFIX, m.start() + len(stem), end))
+            else:
+                tokens.append((token, m.start(), end))
+        return tokens
+
+    def find(self, text):
+        """Return every skill in text as SkillMatch(skill, category, start, end), in order."""
+        tokens = self.tokenize(text)
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self._root
+            best = None
+            j = i
+            while j < len(tokens):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                if _END in node:
+                    best = (node[_END], j)
+                j += 1
+            if best is None:
+                i += 1
+                continue
+            skill, last = best
+            matches.append(SkillMatch(skill, self.categories[skill], tokens[i][1], tokens[last][2]))
+            i = last + 1
+        return matches
+
+    def skill_set(self, text):
+        return {match.skill for match in self.find(text)}
+
+
+# Built once at import; shared by every request
+skill_matcher = SkillMatcher(TAXONOMY)
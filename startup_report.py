@@ -0,0 +1,78 @@
+# startup_report.py
+"""
+Measure how long the app takes to import and start, so boot-time regressions show up.
+
+Run from the directory that contains the package, in a fresh interpreter:
+
+    python -m employee_repo.startup_report [--output startup.json] [--budget-ms 1500]
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import time
+
+PACKAGE = __package__ or 'employee_repo'
+
+# Dependency order, so each entry is charged only for what it adds itself
+MODULES = [
+    'database', 'cache', 'instrumentation', 'auth', 'skills', 'revision', 'executor', 'feature_store', 'similarity', 'analysis',
+    'skill_index', 'ranking', 'repositories', 'http_cache', 'uploads', 'resume_files', 'assets', 'templating', 'forms', 'models', 'bulk_import',
+    'routes.auth_routes', 'routes.employee_routes', 'routes.employer_routes', 'routes.metrics_routes', 'main',
+]
+
+# Heavy dependencies that should only load when something actually needs them
+LAZY_DEPENDENCIES = ['supabase', 'httpx', 'numpy', 'scipy', 'pypdf', 'brotli']
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def measure():
+    report = {"python": sys.version.split()[0], "modules_ms": {}}
+
+    total_start = time.perf_counter()
+    for name in MODULES:
+        start = time.perf_counter()
+        importlib.import_module(f"{PACKAGE}.{name}")
+        report["modules_ms"][name] = _ms(time.perf_counter() - start)
+    report["import_ms"] = _ms(time.perf_counter() - total_start)
+
+    main = sys.modules[f"{PACKAGE}.main"]
+
+    async def run_lifespan():
+        context = main.lifespan(main.app)
+        start = time.perf_counter()
+        await context.__aenter__()
+        startup = time.perf_counter() - start
+        await context.__aexit__(None, None, None)
+        return startup
+
+    report["lifespan_startup_ms"] = _ms(asyncio.run(run_lifespan()))
+    report["total_ms"] = _ms(time.perf_counter() - total_start)
+    report["loaded_lazy_dependencies"] = [name for name in LAZY_DEPENDENCIES if name in sys.modules]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help="also write the report to this JSON file")
+    parser.add_argument('--budget-ms', type=float, help="exit with status 1 if total startup exceeds this")
+    args = parser.parse_args(argv)
+
+    report = measure()
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"Startup took {report['total_ms']} ms, over the {args.budget_ms} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
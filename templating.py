@@ -0,0 +1,73 @@
+# templating.py
+import json
+import os
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from .cache import content_key
+from .instrumentation import span
+from .assets import asset_url, manifest
+
+TEMPLATE_DIR = os.getenv('TEMPLATE_DIR', './employee_repo/templates')
+APP_ENV = os.getenv('APP_ENV', 'production')
+# Reload templates from disk on change; only useful while developing
+TEMPLATE_AUTO_RELOAD = os.getenv('TEMPLATE_AUTO_RELOAD', 'true' if APP_ENV == 'development' else 'false').lower() == 'true'
+# Compiled template bytecode survives worker restarts here (Jinja picks a per-user temp dir if unset)
+TEMPLATE_BYTECODE_CACHE = os.getenv('TEMPLATE_BYTECODE_CACHE', 'true').lower() == 'true'
+TEMPLATE_CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR')
+TEMPLATE_PRECOMPILE = os.getenv('TEMPLATE_PRECOMPILE', 'true').lower() == 'true'
+
+
+def _bytecode_cache():
+    if not TEMPLATE_BYTECODE_CACHE:
+        return None
+    if TEMPLATE_CACHE_DIR:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+
+
+# One environment for the whole process, shared by every router
+environment = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,
+    auto_reload=TEMPLATE_AUTO_RELOAD,
+    bytecode_cache=_bytecode_cache(),
+)
+environment.globals['asset_url'] = asset_url
+
+
+class TimedTemplates(Jinja2Templates):
+    def TemplateResponse(self, *args, **kwargs):
+        with span("render"):
+            return super().TemplateResponse(*args, **kwargs)
+
+
+templates = TimedTemplates(env=environment)
+
+
+def precompile_templates():
+    """Compile every template up front so the first request after a deploy does not pay for it."""
+    names = environment.list_templates()
+    for name in names:
+        environment.get_template(name)
+    return names
+
+
+def render_version():
+    """
+    Hash of every template source plus the asset manifest, and the newest template
+    modification time; call once assets are prepared.
+    """
+    parts = [json.dumps(manifest, sort_keys=True)]
+    last_modified = 0.0
+    for name in sorted(environment.list_templates()):
+        source, filename, _ = environment.loader.get_source(environment, name)
+        parts += [name, source]
+        if filename:
+            last_modified = max(last_modified, os.path.getmtime(filename))
+    return content_key(*parts), last_modified
+
+
+def stream_template(name, context):
+    """Render a template chunk by chunk so the first bytes go out before the page is complete."""
+    return StreamingResponse(environment.get_template(name).generate(context), media_type="text/html")
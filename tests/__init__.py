@@ -0,0 +1,2 @@
+# tests/__init__.py
+# Run with `python -m pytest` from the repository root
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+
+# Tests run against the in-process stand-in backend, never a Supabase project
+os.environ.setdefault('DATA_BACKEND', 'memory')
+os.environ.setdefault('FEATURE_STORE_PATH', '')
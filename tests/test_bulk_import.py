@@ -0,0 +1,42 @@
+# tests/test_bulk_import.py
+import asyncio
+import io
+from starlette.datastructures import UploadFile
+from .. import bulk_import
+from ..bulk_import import iter_records
+
+
+def records(data):
+    async def collect():
+        return [record async for record in iter_records(UploadFile(io.BytesIO(data)), 'csv')]
+    return asyncio.run(collect())
+
+
+def test_bare_quote_inside_a_field_is_plain_text():
+    data = (
+        b'first_name,last_name,notes\n'
+        b'Jo,O"Neil,a\n'
+        b'Ann,Lee,"27"" monitor"\n'
+        b'Max,Roe,5" monitor\n'
+    )
+    assert records(data) == [
+        (1, {"first_name": "Jo", "last_name": 'O"Neil', "notes": "a"}, None),
+        (2, {"first_name": "Ann", "last_name": "Lee", "notes": '27" monitor'}, None),
+        (3, {"first_name": "Max", "last_name": "Roe", "notes": '5" monitor'}, None),
+    ]
+
+
+def test_quoted_field_may_span_lines():
+    data = b'name,notes\nJo,"line one\nline, two"\nAnn,x\n'
+    assert records(data) == [
+        (1, {"name": "Jo", "notes": "line one\nline, two"}, None),
+        (2, {"name": "Ann", "notes": "x"}, None),
+    ]
+
+
+def test_unclosed_quote_is_reported_without_swallowing_the_file(monkeypatch):
+    monkeypatch.setattr(bulk_import, 'BULK_IMPORT_MAX_RECORD_CHARS', 20)
+    data = b'name,notes\nJo,"never closed\n' + b'filler line\n' * 3 + b'Ann,x\n'
+    result = records(data)
+    assert result[0][1] is None and result[0][2].startswith("Record is longer")
+    assert result[-1] == (result[-1][0], {"name": "Ann", "notes": "x"}, None)
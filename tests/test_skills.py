@@ -0,0 +1,29 @@
+# tests/test_skills.py
+import pytest
+from ..skills import skill_matcher
+
+
+@pytest.mark.parametrize("text, skills", [
+    ("Python3 and python2.7", {'python'}),
+    ("C++17, C# and c++", {'c++', 'c#'}),
+    ("Python+Django", {'python', 'django'}),
+    ("ReactJS, VueJS and nodejs", {'react', 'vue', 'node.js'}),
+    ("#kubernetes #docker", {'kubernetes', 'docker'}),
+    ("Node.js, detail-oriented", {'node.js', 'detail-oriented'}),
+])
+def test_finds_skills_in_common_spellings(text, skills):
+    assert skill_matcher.skill_set(text) == skills
+
+
+@pytest.mark.parametrize("text", [
+    "good digital marketing",
+    "gopher gitter",
+    "rusty goals, swiftly",
+])
+def test_ignores_skills_inside_other_words(text):
+    assert skill_matcher.skill_set(text) == set()
+
+
+def test_match_spans_cover_the_skill_text():
+    text = "Built ReactJS apps in C++17"
+    assert [text[m.start:m.end] for m in skill_matcher.find(text)] == ['React', 'C++']
@@ -0,0 +1,60 @@
+# uploads.py
+import hashlib
+import os
+import re
+from fastapi import HTTPException, UploadFile, status
+
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(64 * 1024)))
+IMAGE_MAX_BYTES = int(os.getenv('IMAGE_MAX_BYTES', str(5 * 1024 * 1024)))
+
+_EXTENSION_RE = re.compile(r'^\.[a-z0-9]{1,10}$')
+
+
+async def iter_upload(upload: UploadFile, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Yield an upload's content chunk by chunk, from wherever the multipart parser spooled it."""
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+async def hash_upload(upload: UploadFile, max_bytes):
+    """
+    Stream through an upload once, enforcing the size cap, and return (sha256 hex, size).
+    The upload is rewound afterwards so it can be streamed again.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"File is larger than {max_bytes} bytes")
+
+    digest = hashlib.sha256()
+    size = 0
+    async for chunk in iter_upload(upload):
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"File is larger than {max_bytes} bytes")
+        digest.update(chunk)
+    await upload.seek(0)
+    return digest.hexdigest(), size
+
+
+def content_addressed_key(digest, filename):
+    extension = os.path.splitext(filename or '')[1].lower()
+    return f"{digest}{extension if _EXTENSION_RE.match(extension) else ''}"
+
+
+async def store_image(upload: UploadFile, image_store):
+    """
+    Store an uploaded image under a key derived from its content and return its public URL.
+
+    The same photo uploaded twice maps to the same object, so the second upload is
+    skipped. Returns None when there is no file or the store refuses it.
+    """
+    if not upload or not upload.filename:
+        return None
+
+    digest, size = await hash_upload(upload, IMAGE_MAX_BYTES)
+    key = content_addressed_key(digest, upload.filename)
+    if not await image_store.exists(key):
+        if not await image_store.upload(key, iter_upload(upload), upload.content_type, size=size):
+            return None
+    return image_store.public_url(key)